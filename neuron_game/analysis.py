@@ -0,0 +1,107 @@
+from functools import lru_cache
+
+import numpy as np
+
+from neuron_game.ensemble import NeuronEnsemble
+from neuron_game.iaf_cond_alpha import DEFAULT_PARAMS, IAFCondAlpha
+
+# parameters that do not change the excitability of a neuron at rest
+_IGNORED_PARAMS = ("V_m", "I_e")
+
+
+def _params_key(params: dict):
+    new_params = DEFAULT_PARAMS.copy()
+    new_params.update(params or {})
+    return tuple((k, float(v)) for k, v in sorted(new_params.items()) if k not in _IGNORED_PARAMS)
+
+
+def _spike_times(params_key: tuple, currents, duration: float, nb_spikes: int):
+    """
+    Simulate from rest one neuron per constant input current (in pA), all together.
+    Returns the times of the first nb_spikes spikes of each of them, nan when they did not
+    spike that many times within duration ms.
+    """
+    params = dict(params_key)
+    currents = np.asarray(currents, dtype=float)
+    neuron = IAFCondAlpha(dict(params, V_m=params["E_L"]))
+    neuron.init_buffers(neuron.dt)
+    ensemble = NeuronEnsemble([neuron], len(currents), 0.0, params={"I_e": currents[:, None]})
+    no_input = np.zeros(ensemble.shape)
+    spike_times = np.full((len(currents), nb_spikes), np.nan)
+    counts = np.zeros(len(currents), dtype=int)
+    # without inputs, V_m converges to E_L + I_e / g_L and cannot reach a higher threshold
+    done = params["E_L"] + currents / params["g_L"] <= params["V_th"]
+    for step in range(int(round(duration / neuron.dt))):
+        spiked = ensemble.update(no_input, no_input)[:, 0]
+        if spiked.any():
+            spiked = np.flatnonzero(spiked & (counts < nb_spikes))
+            spike_times[spiked, counts[spiked]] = step * neuron.dt
+            counts[spiked] += 1
+            done[spiked] |= counts[spiked] >= nb_spikes
+            if done.all():
+                break
+    return spike_times
+
+
+@lru_cache(maxsize=256)
+def _fi_curve(params_key: tuple, currents: tuple, duration: float):
+    spike_times = _spike_times(params_key, currents, duration, 2)
+    # after the first spike, the neuron fires periodically from V_reset
+    intervals = spike_times[:, 1] - spike_times[:, 0]
+    rates = np.where(np.isnan(intervals), 0.0, 1000.0 / intervals)
+    rates.setflags(write=False)
+    return rates
+
+
+def fi_curve(params: dict = None, currents=None, duration: float = 1000.0):
+    """
+    Compute the firing rate (in Hz) of a neuron for constant input currents (in pA,
+    41 levels between 0 and 1000 by default). Neurons spiking less than twice within
+    duration ms have a null rate.
+    Results are cached per parameter set.
+    Returns the currents and rates.
+    """
+    currents = np.linspace(0.0, 1000.0, 41) if currents is None else np.asarray(currents)
+    assert currents.ndim == 1 and len(currents) > 0
+    assert duration > 0.0
+    rates = _fi_curve(_params_key(params), tuple(currents.tolist()), float(duration))
+    return currents, rates
+
+
+@lru_cache(maxsize=256)
+def _rheobase(
+    params_key: tuple, max_current: float, duration: float, tolerance: float, nb_levels: int
+):
+    if np.isnan(_spike_times(params_key, [max_current], duration, 1)[0, 0]):
+        return np.nan
+    # below this current, V_m converges under the threshold
+    params = dict(params_key)
+    low, high = max(0.0, params["g_L"] * (params["V_th"] - params["E_L"])), max_current
+    while high - low > tolerance:
+        currents = np.linspace(low, high, nb_levels + 2)[1:-1]
+        spiked = ~np.isnan(_spike_times(params_key, currents, duration, 1)[:, 0])
+        if spiked.any():
+            first = np.argmax(spiked)
+            high = currents[first]
+            low = currents[first - 1] if first > 0 else low
+        else:
+            low = currents[-1]
+    return high
+
+
+def rheobase(
+    params: dict = None,
+    max_current: float = 2000.0,
+    duration: float = 1000.0,
+    tolerance: float = 0.5,
+    nb_levels: int = 16,
+):
+    """
+    Find the smallest constant input current (in pA) making a neuron at rest spike within
+    duration ms, up to tolerance. The search interval is split at nb_levels currents
+    simulated together, so that it shrinks nb_levels + 1 times per iteration.
+    Returns nan if the neuron does not spike for max_current.
+    Results are cached per parameter set.
+    """
+    assert max_current > 0.0 and tolerance > 0.0 and nb_levels > 0
+    return _rheobase(_params_key(params), float(max_current), float(duration), tolerance, nb_levels)
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import time
+from os import makedirs
+from os.path import join
+from uuid import uuid4
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT UNIQUE NOT NULL,
+    date REAL NOT NULL,
+    duration REAL NOT NULL,
+    winner INTEGER NOT NULL,
+    target_mean REAL NOT NULL,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player INTEGER NOT NULL,
+    key_count INTEGER NOT NULL,
+    spike_count INTEGER NOT NULL,
+    PRIMARY KEY (match_id, player)
+);
+CREATE INDEX IF NOT EXISTS matches_winner ON matches(winner);
+CREATE INDEX IF NOT EXISTS matches_date ON matches(date);
+CREATE INDEX IF NOT EXISTS players_player ON players(player);
+"""
+
+
+class MatchArchive:
+    """
+    Archive of past multiplayer matches stored in a folder: per-match summaries are indexed in
+    a SQLite database and full traces are stored as binary npz files next to it.
+    Summary queries only read the database.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.traces_folder = join(folder, "traces")
+        makedirs(self.traces_folder, exist_ok=True)
+        self.connection = sqlite3.connect(join(folder, "matches.sqlite"))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def add_match(
+        self,
+        duration: float,
+        winner: int,
+        target_mean: float,
+        players: list[dict],
+        params: dict,
+        traces: dict = None,
+    ):
+        """
+        Store the summary of a match and its traces. players lists for each player (numbered
+        from 1) a dict with its key_count and spike_count. traces maps names to arrays.
+        Returns the uuid of the match.
+        """
+        uuid = str(uuid4())
+        if traces:
+            np.savez_compressed(join(self.traces_folder, f"{uuid}.npz"), **traces)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO matches (uuid, date, duration, winner, target_mean, params) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (uuid, time.time(), duration, winner, target_mean, json.dumps(params)),
+            )
+            self.connection.executemany(
+                "INSERT INTO players (match_id, player, key_count, spike_count) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (cursor.lastrowid, i + 1, player["key_count"], player["spike_count"])
+                    for i, player in enumerate(players)
+                ],
+            )
+        return uuid
+
+    def load_traces(self, uuid: str):
+        with np.load(join(self.traces_folder, f"{uuid}.npz")) as data:
+            return dict(data)
+
+    def leaderboard(self):
+        """
+        Return for each player its number of matches and wins, and its mean key and spike
+        counts, best players first.
+        """
+        return [
+            dict(row)
+            for row in self.connection.execute(
+                "SELECT player, COUNT(*) AS matches, SUM(winner = player) AS wins, "
+                "AVG(key_count) AS mean_key_count, AVG(spike_count) AS mean_spike_count "
+                "FROM players JOIN matches ON matches.id = players.match_id "
+                "GROUP BY player ORDER BY wins DESC, player"
+            )
+        ]
+
+    def history(self, limit: int = 10):
+        """
+        Return the summaries of the latest matches, most recent first.
+        """
+        rows = self.connection.execute(
+            "SELECT uuid, date, duration, winner, target_mean, params FROM matches "
+            "ORDER BY date DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(row, params=json.loads(row["params"])) for row in rows]
+
+    def statistics(self):
+        """
+        Return the number of matches, the mean and extrema of the target mean V_m.
+        """
+        row = self.connection.execute(
+            "SELECT COUNT(*) AS matches, AVG(target_mean) AS mean_target_mean, "
+            "MIN(target_mean) AS min_target_mean, MAX(target_mean) AS max_target_mean "
+            "FROM matches"
+        ).fetchone()
+        return dict(row)
+
+    def close(self):
+        self.connection.close()
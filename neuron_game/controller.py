@@ -1,6 +1,10 @@
+import copy
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from itertools import groupby
+from operator import itemgetter
 from os import remove
 from os.path import abspath, dirname, exists, join
 from tkinter import BOTH, LEFT, RAISED, RIDGE, SUNKEN, Button, Frame, Label, Scale
@@ -8,10 +12,16 @@ from uuid import uuid4
 
 import numpy as np
 
-from neuron_game.display import EXCITATORY_BLUE, INHIBITORY_RED, PlotDisplay
+from neuron_game.analysis import fi_curve, rheobase
+from neuron_game.display import EXCITATORY_BLUE, INHIBITORY_RED, FICurveDisplay, PlotDisplay
+from neuron_game.ensemble import NeuronEnsemble
+from neuron_game.feed import StateFeed
 from neuron_game.iaf_cond_alpha import PARAMETERS_NAME, RANGES, IAFCondAlpha
-
-KEYS_TAKEN = set()
+from neuron_game.inputs import BackgroundInput
+from neuron_game.metrics import LatencyMonitor
+from neuron_game.plasticity import STDP
+from neuron_game.snapshot import dump_state, load_state
+from neuron_game.spikes import SpikeTrain
 
 
 class InputController:
@@ -33,10 +43,16 @@ class InputController:
         self.observer = observer
 
     def stim_input(self):
-        if not self.pressed:
-            self.pressed = True
-            self.stim_button.config(relief=SUNKEN)
-            self.observer.receive_spike(self.weight, self.delay)
+        """
+        Send a spike to the neuron unless the button is still pressed.
+        Returns whether a spike was sent.
+        """
+        if self.pressed:
+            return False
+        self.pressed = True
+        self.stim_button.config(relief=SUNKEN)
+        self.observer.receive_spike(self.weight, self.delay)
+        return True
 
     def _delay_button_raise(self):
         if self.pressed:
@@ -46,6 +62,14 @@ class InputController:
     def end_wait_for_key(self):
         self.wait_for_key = False
 
+    def take_key(self, key):
+        self.keys.append(key)
+        self.observer.key_index[key] = self
+
+    def release_key(self, key):
+        self.keys.remove(key)
+        self.observer.key_index.pop(key, None)
+
 
 class MultiInputController(InputController):
     def __init__(self, root, button_text, color, column, weight, delay, observer):
@@ -64,10 +88,17 @@ class MultiInputController(InputController):
         self.keys = []
 
     def add_key(self, key):
-        self.keys.append(key)
+        self.take_key(key)
         self.text.config(text=", ".join(self.keys))
         self.end_wait_for_key()
 
+    def set_keys(self, keys):
+        for key in list(self.keys):
+            self.release_key(key)
+        for key in keys:
+            self.take_key(key)
+        self.text.config(text=", ".join(self.keys))
+
     def end_wait_for_key(self):
         super().end_wait_for_key()
         self.control_button.config(relief=RAISED)
@@ -90,93 +121,172 @@ class RandomInputController(InputController):
 
     def select_random_key(self):
         selection = random.choice(string.ascii_letters).upper()
-        while selection in KEYS_TAKEN:
+        while selection in self.observer.key_index:
             selection = random.choice(string.ascii_letters).upper()
         if len(self.keys) > 0:
-            old_key = self.keys.pop(0)
-            KEYS_TAKEN.remove(old_key)
-        self.keys.append(selection)
-        KEYS_TAKEN.add(selection)
+            self.release_key(self.keys[0])
+        self.take_key(selection)
         self.stim_button.config(text=selection)
         self.wait_for_key = False
         return selection
 
+    def set_keys(self, keys):
+        for key in list(self.keys):
+            self.release_key(key)
+        for key in keys:
+            self.take_key(key)
+        self.stim_button.config(text=self.keys[0] if len(self.keys) > 0 else "")
+        self.wait_for_key = len(self.keys) == 0
 
-class NeuronParams:
-    def __init__(self, root, params: dict, observer):
-        self.pressed = False
-        self.observer = observer
 
-        self.params_button = []
-        self.labels = []
-        self.tips = []
-        loc_root = root
-        while loc_root.master.master is not None:
-            loc_root = loc_root.master
-
-        for i, (k, v) in enumerate(params.items()):
-            self.labels.append(Label(root, text=k))
-            self.tips.append(Label(loc_root, text=PARAMETERS_NAME[k], bg="yellow"))
-            self.labels[-1].bind("<Enter>", partial(self.show_tip, tip=self.tips[-1]))
-            self.labels[-1].bind("<Leave>", partial(self.hide_tip, tip=self.tips[-1]))
-            self.params_button.append(
-                Scale(
-                    root,
-                    from_=RANGES[k][0],
-                    to=RANGES[k][1],
-                    resolution=(RANGES[k][1] - RANGES[k][0]) / 100,
-                    showvalue=True,
-                    orient="horizontal",
-                    command=partial(self.slider_changed, k),
-                )
+def _fi_analysis(params: dict):
+    """
+    Coarse f-I curve and rheobase of a neuron, cheap enough to follow slider moves.
+    """
+    currents, rates = fi_curve(params, np.linspace(0.0, 1000.0, 21), duration=200.0)
+    return currents, rates, rheobase(params, duration=200.0, tolerance=1.0)
+
+
+class NeuronParams:
+    """
+    Parameter editor shared by the neurons of a game, bound to one of them at a time.
+    Slider moves are stored and applied to the neuron once per simulation step.
+    The f-I curve of the neuron is computed in a background thread, one parameter set at a
+    time, and drawn at the first step after it is ready.
+    """
+
+    def __init__(self, root, observer):
+        self.root = Frame(root, relief=RIDGE, borderwidth=2)
+        self.observer = None
+        self.pending = {}
+        self.tip = None  # shared by the labels, created when first shown
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.analysis = None  # future of the running f-I analysis
+        self.curve_stale = True
+
+        self.title = Label(self.root)
+        self.title.grid(column=0, row=0, columnspan=6, pady=(5, 0))
+        self.params_button = {}
+        for i, k in enumerate(PARAMETERS_NAME):
+            label = Label(self.root, text=k)
+            label.bind("<Enter>", partial(self.show_tip, key=k))
+            label.bind("<Leave>", self.hide_tip)
+            self.params_button[k] = Scale(
+                self.root,
+                from_=RANGES[k][0],
+                to=RANGES[k][1],
+                resolution=(RANGES[k][1] - RANGES[k][0]) / 100,
+                showvalue=True,
+                orient="horizontal",
+                command=partial(self.slider_changed, k),
             )
-            self.params_button[-1].set(v)
-            self.labels[-1].grid(column=(i * 2) % 6, row=i // 3, padx=0, pady=5, sticky="se")
-            self.params_button[-1].grid(
-                column=(i * 2) % 6 + 1, row=i // 3, padx=(0, 10), pady=5, sticky="nw"
+            label.grid(column=(i * 2) % 6, row=i // 3 + 1, padx=0, pady=5, sticky="se")
+            self.params_button[k].grid(
+                column=(i * 2) % 6 + 1, row=i // 3 + 1, padx=(0, 10), pady=5, sticky="nw"
             )
+        self.fi_curve = FICurveDisplay(self.root)
+        self.fi_curve.grid(column=6, row=0, rowspan=4, padx=5, pady=5)
+        self.bind(observer)
 
-    def show_tip(self, event, tip):
-        root = event.widget.master
-        while root.master is not None:
-            root = root.master
-        tip.place(
-            x=event.x_root - tip.master.winfo_rootx(),
-            y=event.y_root - tip.master.winfo_rooty(),
+    def bind(self, observer):
+        """
+        Edit the parameters of the neuron of another NeuronController.
+        """
+        if self.observer is not None:
+            for key, value in self.pending.items():
+                self.observer.change_params(key, value)
+        self.pending.clear()
+        self.observer = observer
+        params = observer.neuron.get_params()
+        for k, slider in self.params_button.items():
+            slider.set(params[k])
+        self.title.config(text=f"Parameters: {observer.plotView.ax.get_title()}")
+        self.curve_stale = True
+
+    def show_tip(self, event, key):
+        if self.tip is None:
+            tip_root = self.root
+            while tip_root.master.master is not None:
+                tip_root = tip_root.master
+            self.tip = Label(tip_root, bg="yellow")
+        self.tip.config(text=PARAMETERS_NAME[key])
+        self.tip.place(
+            x=event.x_root - self.tip.master.winfo_rootx(),
+            y=event.y_root - self.tip.master.winfo_rooty(),
         )
-        tip.tkraise()
+        self.tip.tkraise()
 
-    def hide_tip(self, event, tip):
-        tip.place_forget()
+    def hide_tip(self, event):
+        if self.tip is not None:
+            self.tip.place_forget()
 
     def slider_changed(self, key, slider):
-        self.observer.change_params(key, float(slider))
+        self.pending[key] = float(slider)
+
+    def apply(self):
+        """
+        Set the parameters changed since the last call on the neuron and refresh its f-I
+        curve when they changed.
+        """
+        for key, value in self.pending.items():
+            self.observer.change_params(key, value)
+            self.curve_stale = True
+        self.pending.clear()
+        if self.analysis is not None and self.analysis.done():
+            if self.fi_curve.figure is not None:
+                self.fi_curve.update(*self.analysis.result())
+            self.analysis = None
+        if self.curve_stale and self.analysis is None:
+            neuron = self.observer.neuron
+            params = dict(neuron.get_params(), t_ref=neuron.t_ref, dt=neuron.dt)
+            self.analysis = self.executor.submit(_fi_analysis, params)
+            self.curve_stale = False
+
+    def release(self):
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.fi_curve.release()
+        if self.tip is not None:
+            self.tip.destroy()
 
 
 class NeuronController:
     def __init__(
         self,
         neuron: IAFCondAlpha,
-        view: PlotDisplay,
+        view: PlotDisplay | None,
         current_time: float = 0.0,
         excitatory_weight: float = 100.0,
         inhibitory_weight: float = -100.0,
         syn_delay: float = 0.1,
-        display_parameters: bool = False,
         display_controls: int = 0,
         save_values: bool = False,
+        key_index: dict = None,
+        latency: LatencyMonitor = None,
     ):
         assert syn_delay > 0
         assert inhibitory_weight < 0
         assert excitatory_weight > 0
+        # headless controllers (view is None) have no widgets
+        assert view is not None or display_controls == 0
         self.current_time = current_time
         self.neuron = neuron
         self.plotView = view
-        self.controllerView = Frame(view.frame, relief=RIDGE, borderwidth=2)
+        if view is not None:
+            self.controllerView = Frame(view.frame, relief=RIDGE, borderwidth=2)
         self.save_values = save_values
         self.keys = []
+        # key -> input controller, shared by the controllers of a same game
+        self.key_index = key_index if key_index is not None else {}
+        self.latency = latency
+        self.keypress_time = None
+        self.key_count = 0
+        self.spikes = SpikeTrain()
+        self.background_inputs = []  # [source, time until which its spikes are buffered]
         if self.save_values:
-            self.save_file = join(dirname(dirname(abspath(__file__))), f"vm_{uuid4()}.txt")
+            uuid = uuid4()
+            self.save_file = join(dirname(dirname(abspath(__file__))), f"vm_{uuid}.txt")
+            self.spike_file = join(dirname(dirname(abspath(__file__))), f"spikes_{uuid}.txt")
         if display_controls == 1:
             self.buttonsView = Frame(self.controllerView, relief=RIDGE, borderwidth=2)
             self.stim_controllers = [
@@ -201,27 +311,93 @@ class NeuronController:
             ]
         else:
             self.stim_controllers = []
-        if display_parameters:
-            self.paramsView = Frame(self.controllerView, relief=RIDGE, borderwidth=2)
-            self.params_controller = NeuronParams(self.paramsView, self.neuron.get_params(), self)
 
         self.wait_for_key = -1
 
     def remove_files(self):
-        if self.save_values and exists(self.save_file):
-            remove(self.save_file)
+        if self.save_values:
+            for filename in [self.save_file, self.spike_file]:
+                if exists(filename):
+                    remove(filename)
             self.save_values = False
 
+    def add_background_input(self, source: BackgroundInput):
+        nb_steps = int(round(source.horizon / self.neuron.dt))
+        if nb_steps > self.neuron.size_buffer:
+            self.neuron.resize_buffers(source.horizon, self.current_time)
+        self.background_inputs.append([source, self.current_time])
+
+    def feed_background_inputs(self):
+        dt = self.neuron.dt
+        for background in self.background_inputs:
+            source, until = background
+            if self.current_time < until - dt / 2:
+                continue
+            nb_steps = int(round(source.horizon / dt))
+            inputs = source.binned(until, nb_steps, dt)
+            if source.weight > 0:
+                self.neuron.receive_block(until, inputs, np.zeros(nb_steps))
+            else:
+                self.neuron.receive_block(until, np.zeros(nb_steps), -inputs)
+            background[1] = until + nb_steps * dt
+
     def update(self, dt: float):
+        if self.background_inputs:
+            self.feed_background_inputs()
         spiked = self.neuron.update(self.current_time)
         if self.save_values:
             with open(self.save_file, "a") as f:
                 f.write(f"{self.current_time}\t{self.neuron.V_m}\n")
-        self.plotView.update(self.current_time, self.neuron.V_m, spike=spiked)
+        if spiked:
+            self.spikes.add(self.current_time)
+            if self.save_values:
+                with open(self.spike_file, "a") as f:
+                    f.write(f"{self.current_time}\n")
+        if self.plotView is not None:
+            self.plotView.update(self.current_time, self.neuron.V_m, spikes=self.spikes)
+        if self.keypress_time is not None:
+            if self.latency is not None and self.plotView is not None:
+                self.latency.record("display", self.keypress_time)
+            self.keypress_time = None
         self.update_keys(spiked)
         self.current_time += dt
         return spiked
 
+    def run_block(self, nb_steps: int):
+        """
+        Advance the neuron by nb_steps steps without refreshing the widgets, assuming that
+        it receives no spike from other neurons in between.
+        Returns the indices of the steps at which it spiked, from the start of the block.
+        """
+        dt = self.neuron.dt
+        start_time = self.current_time
+        v_m = np.zeros(nb_steps, dtype=self.neuron.dtype) if self.save_values else None
+        spike_steps = []
+        done = 0
+        while done < nb_steps:
+            nb_block = nb_steps - done
+            if self.background_inputs:
+                # stop where the buffered background inputs end
+                self.feed_background_inputs()
+                until = min(background[1] for background in self.background_inputs)
+                nb_block = min(nb_block, max(1, int(round((until - self.current_time) / dt))))
+            spiked = self.neuron.run_block(
+                self.current_time, nb_block, None if v_m is None else v_m[done:]
+            )
+            spike_steps.extend(done + k for k in spiked)
+            done += nb_block
+            self.current_time = start_time + done * dt
+        spike_times = [start_time + k * dt for k in spike_steps]
+        self.spikes.extend(spike_times)
+        if self.save_values:
+            times = start_time + np.arange(nb_steps) * dt
+            with open(self.save_file, "a") as f:
+                f.writelines(f"{t}\t{v}\n" for t, v in zip(times, v_m, strict=True))
+            if len(spike_times) > 0:
+                with open(self.spike_file, "a") as f:
+                    f.writelines(f"{t}\n" for t in spike_times)
+        return spike_steps
+
     def update_keys(self, spiked=False):
         found_waiting = -1
         for i, controller in enumerate(self.stim_controllers):
@@ -242,7 +418,6 @@ class NeuronController:
 
     def add_key(self, key):
         self.stim_controllers[self.wait_for_key].add_key(key)
-        KEYS_TAKEN.add(key)
         self.wait_for_key = -1
 
     def reset_add_key(self):
@@ -250,11 +425,14 @@ class NeuronController:
         for controller in self.stim_controllers:
             controller.end_wait_for_key()
 
-    def strike(self, key):
-        for controller in self.stim_controllers:
-            if key in controller.keys:
-                controller.stim_input()
-                break
+    def strike(self, key, keypress_time: float = None):
+        controller = self.key_index.get(key)
+        # presses ignored while the button is still pressed are not counted
+        if controller is not None and controller.observer is self and controller.stim_input():
+            self.key_count += 1
+            self.keypress_time = keypress_time
+            if keypress_time is not None and self.latency is not None:
+                self.latency.record("stimulus", keypress_time)
 
     def receive_spike(self, weight: float, delay: float):
         self.neuron.receive_spike(self.current_time, weight, delay)
@@ -266,14 +444,14 @@ class NeuronController:
         """
         Put the controller widget on the parent widget.
         """
+        if self.plotView is None:
+            return
         self.plotView.grid(row=row, column=column, sticky=sticky)
         self.controllerView.grid(row=1, column=0)  # place CanvasImage widget on the grid
         self.controllerView.grid(sticky=sticky)  # make frame container sticky
         self.controllerView.rowconfigure(0, weight=1)  # make canvas expandable
         self.controllerView.columnconfigure(0, weight=1)
         self.controllerView.columnconfigure(1, weight=2)
-        if hasattr(self, "paramsView"):
-            self.paramsView.grid(row=0, column=1, sticky=sticky)  # make frame container sticky
         if hasattr(self, "buttonsView"):
             self.buttonsView.grid(row=0, column=0, sticky=sticky)
 
@@ -281,7 +459,7 @@ class NeuronController:
 class GameController:
     def __init__(
         self,
-        views: list[PlotDisplay],
+        views: list[PlotDisplay | None],
         neurons: list[IAFCondAlpha],
         display_parameters: list[bool] = None,
         display_controls: list[int] = None,
@@ -289,6 +467,9 @@ class GameController:
         save_values: bool = False,
         simulation_duration: float = -1.0,
         start_paused: bool = False,
+        plasticity: STDP = None,
+        delays: list[float] = None,
+        feed: StateFeed = None,
     ):
         assert len(views) > 0
         assert len(views) == len(neurons)
@@ -302,6 +483,9 @@ class GameController:
             connectome = np.zeros((len(neurons), len(neurons)), dtype=float)
         assert connectome.shape == (len(neurons), len(neurons))
         self.connectome = connectome
+        assert plasticity is None or plasticity.connectome is connectome
+        self.plasticity = plasticity
+        self.feed = feed
         self.save_values = save_values
 
         self.current_time = 0
@@ -309,26 +493,37 @@ class GameController:
         self.dt = 0.1
         self.is_paused = start_paused
 
-        self.delays = [0.1] * len(neurons)
+        self.delays = list(delays) if delays is not None else [0.1] * len(neurons)
+        assert len(self.delays) == len(neurons)
+        assert min(self.delays) >= self.dt
         for neuron, delay in zip(neurons, self.delays, strict=False):
             neuron.dt = self.dt
             neuron.init_buffers(delay)
         self.weights = [100.0] * len(neurons)
+        self.key_index = {}  # key -> input controller
+        self.latency = LatencyMonitor()
         self.controllers = [
             NeuronController(
                 neuron,
                 view,
                 excitatory_weight=weight,
                 inhibitory_weight=-weight,
-                display_parameters=show_params,
                 display_controls=show_controls,
                 save_values=self.save_values,
+                key_index=self.key_index,
+                latency=self.latency,
             )
-            for neuron, view, weight, show_params, show_controls in zip(
-                neurons, views, self.weights, display_parameters, display_controls, strict=False
+            for neuron, view, weight, show_controls in zip(
+                neurons, views, self.weights, display_controls, strict=False
             )
         ]
-        if len(neurons) > 0:
+        # neurons with editable parameters share one editor, created when first selected
+        self.editable = [i for i, show in enumerate(display_parameters) if show]
+        assert all(views[i] is not None for i in self.editable)
+        self.params_editor = None
+        self.selected = -1
+        self.headless = all(view is None for view in views)
+        if not self.headless:
             root = views[0].frame.master
             self.pause_frame = Frame(root)
             self.pause_frame.tkraise()
@@ -336,24 +531,43 @@ class GameController:
             self.pause_frame.columnconfigure(0, weight=1)
             self.time_label = Label(self.pause_frame, text="PAUSE", font=("Arial", 30, "bold"))
             self.time_label.pack(fill=BOTH, expand=True)
+        for i in self.editable:
+            # added to the bindings of the matplotlib canvas instead of replacing them
+            widget = views[i].canvas.get_tk_widget()
+            widget.bind("<Button-1>", partial(self.select, i), add="+")
         self.wait_for_key = -1
 
     def cleanup(self):
         self.reset_wait_for_key()
+        self.key_index.clear()
         for controller in self.controllers:
             controller.remove_files()
+        if self.params_editor is not None:
+            self.params_editor.release()
+            self.params_editor = None
+
+    def _step(self):
+        spiked_neurons = []
+        for i, controller in enumerate(self.controllers):
+            if controller.update(self.dt):
+                spiked_neurons.append(i)
+                weights = self.connectome[i]
+                for target in np.flatnonzero(np.absolute(weights) >= 1e-3):
+                    self.controllers[target].receive_spike(weights[target], self.delays[target])
+        if self.plasticity is not None:
+            self.plasticity.update(self.current_time, spiked_neurons)
+        self.current_time += self.dt
+        if self.feed is not None:
+            self.feed.publish(self)
 
     def update(self):
+        if self.is_paused:
+            for controller in self.controllers:
+                controller.update_keys()
+        else:
+            self._step()
         found_waiting = -1
         for i, controller in enumerate(self.controllers):
-            if self.is_paused:
-                controller.update_keys()
-            else:
-                spiked = controller.update(self.dt)
-                if spiked:
-                    for target, weight in enumerate(self.connectome[i]):
-                        if np.absolute(weight) >= 1e-3:
-                            self.controllers[target].receive_spike(weight, self.delays[target])
             if controller.wait_for_key >= 0:
                 found_waiting = True
                 if self.wait_for_key != i:
@@ -362,15 +576,75 @@ class GameController:
                     self.wait_for_key = i
         if found_waiting < 0 <= self.wait_for_key:
             self.wait_for_key = -1
+        if self.params_editor is not None:
+            self.params_editor.apply()
         self.show_pause()
-        if not self.is_paused:
-            self.current_time += self.dt
+        return 0 < self.simulation_duration <= self.current_time
+
+    def run(self, duration: float):
+        """
+        Advance the simulation by duration ms without refreshing the widgets.
+        A spike cannot reach another neuron within the minimum synaptic delay, so each neuron
+        runs through blocks of steps of that length and spikes are routed once per block,
+        in time order. Blocks of a single step fall back to stepping all neurons together.
+        Returns True when the simulation duration is reached.
+        """
+        block = max(1, int(round(min(self.delays) / self.dt)))
+        nb_steps = int(round(duration / self.dt))
+        if block == 1:
+            for _ in range(nb_steps):
+                self._step()
+            return 0 < self.simulation_duration <= self.current_time
+        done = 0
+        while done < nb_steps:
+            nb_block = min(block, nb_steps - done)
+            start_time = self.current_time
+            events = []
+            for source, controller in enumerate(self.controllers):
+                events.extend((k, source) for k in controller.run_block(nb_block))
+            events.sort()
+            for k, group in groupby(events, key=itemgetter(0)):
+                t = start_time + k * self.dt
+                spiked = [source for _, source in group]
+                for source in spiked:
+                    weights = self.connectome[source]
+                    for target in np.flatnonzero(np.absolute(weights) >= 1e-3):
+                        # as in update, neurons stepped before the source get it a step later
+                        self.controllers[target].neuron.receive_spike(
+                            t + self.dt if target <= source else t,
+                            weights[target],
+                            self.delays[target],
+                        )
+                if self.plasticity is not None:
+                    self.plasticity.update(t, spiked)
+            done += nb_block
+            self.current_time += nb_block * self.dt
+            if self.plasticity is not None:
+                self.plasticity.update(self.current_time, [])
+            if self.feed is not None:
+                self.feed.publish(self)
         return 0 < self.simulation_duration <= self.current_time
 
     def grid(self):
         for i, controller in enumerate(self.controllers):
             column = 1 if i > 0 and i == len(self.controllers) - 1 else i % 2
             controller.grid(row=0, column=column, sticky="nsw" if i == 0 else "nse")
+        if len(self.editable) > 0:
+            self.select(self.editable[0])
+
+    def select(self, i: int, event=None):
+        """
+        Bind the parameter editor to the i-th neuron, creating it on first use in the
+        controller frame of the first editable neuron.
+        """
+        assert i in self.editable
+        if self.params_editor is None:
+            host = self.controllers[self.editable[0]]
+            self.params_editor = NeuronParams(host.controllerView, self.controllers[i])
+            self.params_editor.root.grid(row=0, column=1, sticky="nsw")
+        elif self.selected != i:
+            self.params_editor.bind(self.controllers[i])
+        self.selected = i
 
     def reset_wait_for_key(self):
         self.wait_for_key = -1
@@ -378,6 +652,8 @@ class GameController:
             controller.reset_add_key()
 
     def show_pause(self):
+        if self.headless:
+            return
         if self.is_paused:
             if self.time_label.config()["text"][-1] != "PAUSE":
                 self.time_label.config(text="PAUSE")
@@ -399,14 +675,71 @@ class GameController:
                 )
 
     def _keystroke(self, event):
+        keypress_time = self.latency.event_time(event.time)
         key_stroke = event.char.upper()
         if event.keysym == "space":
             self.is_paused = not self.is_paused
         if not key_stroke.isalnum():
             return
-        for controller in self.controllers:
-            if controller.wait_for_key >= 0 and key_stroke not in KEYS_TAKEN:
+        stim_controller = self.key_index.get(key_stroke)
+        if stim_controller is None:
+            if self.wait_for_key >= 0:
                 self.controllers[self.wait_for_key].add_key(key_stroke)
                 self.wait_for_key = -1
-            elif controller.wait_for_key < 0 and not self.is_paused and key_stroke in KEYS_TAKEN:
-                controller.strike(key_stroke)
+        elif not self.is_paused and stim_controller.observer.wait_for_key < 0:
+            stim_controller.observer.strike(key_stroke, keypress_time)
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize the state of the simulation into a binary blob.
+        """
+        return dump_state(self)
+
+    def restore(self, blob: bytes):
+        """
+        Restore a state produced by snapshot, keeping the current widgets.
+        """
+        load_state(self, blob)
+
+    def fork(self):
+        """
+        Return a headless copy of the simulation that can be run independently.
+        The plasticity rule of the copy does not save weight snapshots.
+        """
+        nb_neurons = len(self.controllers)
+        connectome = self.connectome.copy()
+        plasticity = None
+        if self.plasticity is not None:
+            plasticity = self.plasticity.copy(connectome)
+            plasticity.snapshot_interval = -1.0
+        game = GameController(
+            [None] * nb_neurons,
+            [IAFCondAlpha(dtype=controller.neuron.dtype) for controller in self.controllers],
+            display_parameters=[False] * nb_neurons,
+            display_controls=[0] * nb_neurons,
+            connectome=connectome,
+            simulation_duration=self.simulation_duration,
+            plasticity=plasticity,
+            delays=self.delays,
+        )
+        for controller, forked in zip(self.controllers, game.controllers, strict=True):
+            forked.background_inputs = copy.deepcopy(controller.background_inputs)
+        game.restore(self.snapshot())
+        game.is_paused = False
+        return game
+
+    def look_ahead(self, schedules):
+        """
+        Predict the response of every neuron to alternative input schedules, starting from
+        the current state and without changing it.
+
+        schedules has a (nb_candidates, nb_steps, nb_neurons) shape and holds the weight of
+        the inputs arriving at each neuron at each of the next steps.
+        Returns the predicted membrane potentials and spike events, with the same shape.
+        """
+        ensemble = NeuronEnsemble(
+            [controller.neuron for controller in self.controllers],
+            len(schedules),
+            self.controllers[0].current_time,
+        )
+        return ensemble.run(schedules, self.connectome, self.delays)
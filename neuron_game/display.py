@@ -1,15 +1,80 @@
+from functools import partial
 from os.path import isfile
 from tkinter import Frame
 
 import numpy as np
-from matplotlib import pylab as plt
+from matplotlib.artist import setp
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from neuron_game.spikes import SpikeTrain
 
 EXCITATORY_BLUE = "#add8e6"
 INHIBITORY_RED = "#f1807e"
 SPIKE_COLOR = "limegreen"
 
 
+def _spike_collection(ax):
+    """
+    Single artist holding every spike marker of an axis, spanning its full height.
+    """
+    return ax.vlines([], 0, 1, transform=ax.get_xaxis_transform(), linewidth=2.0, color=SPIKE_COLOR)
+
+
+def _set_spike_times(collection, spike_times):
+    segments = np.zeros((len(spike_times), 2, 2))
+    segments[:, :, 0] = np.asarray(spike_times)[:, None]
+    segments[:, 1, 1] = 1.0
+    collection.set_segments(segments)
+
+
+class FigurePool:
+    """
+    Figures kept outside of pyplot and reused across game sessions, grouped by layout.
+    """
+
+    def __init__(self):
+        self.free = {}
+
+    def acquire(self, key, factory):
+        figures = self.free.get(key, [])
+        return figures.pop() if len(figures) > 0 else factory()
+
+    def release(self, key, figure):
+        self.free.setdefault(key, []).append(figure)
+
+
+FIGURE_POOL = FigurePool()
+
+
+def _new_plot_figure():
+    figure = Figure(figsize=(9.7, 4))
+    ax = figure.add_subplot()
+    ax.plot([], [], linewidth=2.0)
+    _spike_collection(ax)
+    ax.set_xlabel("Time (ms)")
+    figure.set_tight_layout(True)
+    return figure
+
+
+def _new_results_figure(nb_plots):
+    figure = Figure(figsize=(9.7, 6))
+    figure.subplots(nb_plots, 1, sharex=True, sharey=True, squeeze=False)
+    figure.set_tight_layout(True)
+    return figure
+
+
+def _new_fi_figure():
+    figure = Figure(figsize=(3, 2))
+    ax = figure.add_subplot()
+    ax.plot([], [], linewidth=2.0)
+    ax.axvline(0.0, linestyle="--", color="gray")
+    ax.set_xlabel("I_e (pA)")
+    ax.set_ylabel("Rate (Hz)")
+    figure.set_tight_layout(True)
+    return figure
+
+
 class PlotDisplay:
     def __init__(
         self,
@@ -21,24 +86,31 @@ class PlotDisplay:
         color="blue",
         ylabel="Membrane potential (mV)",
         title="Neuron",
+        dtype=np.float64,
     ):
         self.points_displayed = points_displayed
         self.dt = dt
         self.x = np.arange(-self.points_displayed * dt, -dt + 1e-5, dt)
-        self.y = np.full(self.points_displayed, origin_value)
-        self.figure, self.ax = plt.subplots(1, 1, figsize=(9.7, 4))
-        (self.line,) = self.ax.plot(self.x, self.y, color=color, linewidth=2.0)
+        self.y = np.full(self.points_displayed, origin_value, dtype=dtype)
+        self.figure = FIGURE_POOL.acquire("plot", _new_plot_figure)
+        self.ax = self.figure.axes[0]
+        self.line = self.ax.lines[0]
+        self.spike_lines = self.ax.collections[0]
+        self.line.set_data(self.x, self.y)
+        self.line.set_color(color)
+        _set_spike_times(self.spike_lines, [])
         self.ax.set_xlim([self.x[0], self.x[-1] + self.points_displayed * dt])
-        plt.setp(self.ax.get_xticklabels(), ha="right")
+        setp(self.ax.get_xticklabels(), ha="right")
         self.ax.set_ylabel(ylabel)
-        self.ax.set_xlabel("Time (ms)")
         self.ax.set_title(title)
         if ylims is not None:
             self.ax.set_ylim(ylims)
-        self.figure.set_tight_layout(True)
+        else:
+            self.ax.set_autoscaley_on(True)
+            self.ax.relim()
+            self.ax.autoscale_view(scalex=False)
         self.frame = Frame(placeholder)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
-        self.spikes = []
 
     def grid(self, **kw):
         """
@@ -52,23 +124,29 @@ class PlotDisplay:
         self.canvas.get_tk_widget().rowconfigure(0, weight=1)
         self.canvas.get_tk_widget().columnconfigure(0, weight=1)
 
-    def update(self, t: float, new_value: float, spike=False):
+    def update(self, t: float, new_value: float, spikes: SpikeTrain = None):
         buffer_idx = int(np.round(t / self.dt)) % self.points_displayed
         self.x[buffer_idx] = t
         self.y[buffer_idx] = new_value
         displayed_x = np.roll(self.x, -buffer_idx - 1)
         self.line.set_xdata(displayed_x)
         self.line.set_ydata(np.roll(self.y, -buffer_idx - 1))
-        if spike:
-            vline = self.ax.axvline(x=t, linewidth=2.0, color=SPIKE_COLOR)
-            self.spikes.append((t, vline))
+        if spikes is not None:
+            _set_spike_times(self.spike_lines, spikes.window(displayed_x[0], t))
         self.ax.set_xlim([displayed_x[0], t + self.points_displayed * self.dt])
-        if len(self.spikes) > 0 and self.spikes[0][0] < displayed_x[0]:
-            _, vline = self.spikes.pop(0)
-            vline.remove()
 
         self.canvas.draw()
 
+    def release(self):
+        """
+        Destroy the widgets and give the figure back to the pool.
+        """
+        if self.figure is None:
+            return
+        self.frame.destroy()
+        FIGURE_POOL.release("plot", self.figure)
+        self.figure = None
+
 
 class ResultsDisplay:
     def __init__(
@@ -76,6 +154,7 @@ class ResultsDisplay:
         placeholder,
         filenames: list[str],
         threshold: float,
+        spikes: list[SpikeTrain] = None,
         ylims: list[float] = None,
         colors=None,
         ylabel="Membrane potential (mV)",
@@ -89,11 +168,18 @@ class ResultsDisplay:
         assert len(filenames) == len(colors) == len(titles)
         for filename in filenames:
             assert isfile(filename)
+        if spikes is not None:
+            assert len(spikes) == len(filenames)
 
-        self.figure, self.axes = plt.subplots(
-            len(filenames), 1, figsize=(9.7, 6), sharex=True, sharey=True
+        self.pool_key = ("results", len(filenames))
+        self.figure = FIGURE_POOL.acquire(
+            self.pool_key, partial(_new_results_figure, len(filenames))
         )
+        self.axes = self.figure.axes
+        for ax in self.axes:
+            ax.cla()
         self.means = np.zeros(len(filenames))
+        self.traces = []
         for i, (ax, filename, title, color) in enumerate(
             zip(self.axes, filenames, titles, colors, strict=False)
         ):
@@ -106,10 +192,10 @@ class ResultsDisplay:
                     x[j] = float(t)
                     y[j] = float(v_m)
                 self.means[i] = np.mean(y)
-            spikes = np.where(np.array(y) >= threshold)[0]
+            self.traces.append(np.column_stack([x, y]))
+            spike_times = spikes[i].window(x[0], x[-1]) if spikes is not None else x[y >= threshold]
             ax.plot(x, y, color=color, linewidth=2.0)
-            for spike in spikes:
-                ax.axvline(x=x[spike], linewidth=2.0, color=SPIKE_COLOR)
+            _set_spike_times(_spike_collection(ax), spike_times)
             ax.set_ylabel(ylabel)
             ax.set_xlabel("Time (ms)")
             ax.set_title(title)
@@ -132,3 +218,46 @@ class ResultsDisplay:
         self.canvas.get_tk_widget().grid(row=0, column=0, sticky="nwe")
         self.canvas.get_tk_widget().rowconfigure(0, weight=1)
         self.canvas.get_tk_widget().columnconfigure(0, weight=1)
+
+    def release(self):
+        """
+        Destroy the widgets and give the figure back to the pool.
+        """
+        if self.figure is None:
+            return
+        self.frame.destroy()
+        FIGURE_POOL.release(self.pool_key, self.figure)
+        self.figure = None
+
+
+class FICurveDisplay:
+    """
+    Small plot of the firing rate of a neuron as a function of its input current.
+    """
+
+    def __init__(self, placeholder, color="blue"):
+        self.figure = FIGURE_POOL.acquire("fi_curve", _new_fi_figure)
+        self.ax = self.figure.axes[0]
+        self.line, self.rheobase_line = self.ax.lines
+        self.line.set_color(color)
+        self.frame = Frame(placeholder)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+
+    def grid(self, **kw):
+        self.frame.grid(**kw)
+        self.canvas.get_tk_widget().grid(row=0, column=0)
+
+    def update(self, currents, rates, rheobase: float):
+        self.line.set_data(currents, rates)
+        self.rheobase_line.set_xdata([rheobase, rheobase])
+        self.ax.set_xlim([currents[0], currents[-1]])
+        self.ax.set_ylim([0.0, max(1.0, 1.1 * np.max(rates))])
+        self.ax.set_title(f"Rheobase: {rheobase:.0f} pA", fontsize=10)
+        self.canvas.draw_idle()
+
+    def release(self):
+        if self.figure is None:
+            return
+        self.frame.destroy()
+        FIGURE_POOL.release("fi_curve", self.figure)
+        self.figure = None
@@ -0,0 +1,149 @@
+import numpy as np
+
+from neuron_game.iaf_cond_alpha import DEFAULT_PARAMS, IAFCondAlpha
+
+ENSEMBLE_PARAMS = [k for k in DEFAULT_PARAMS if k not in ("V_m", "dt")]
+
+
+class NeuronEnsemble:
+    """
+    Batch of nb_members copies of a population of IAFCondAlpha neurons, simulated together
+    with the same update rule. Arrays of variables have a (nb_members, nb_neurons) shape.
+    """
+
+    def __init__(
+        self,
+        neurons: list[IAFCondAlpha],
+        nb_members: int,
+        t: float,
+        params: dict = None,
+        dtype=None,
+    ):
+        """
+        Clone the current state of the neurons, including their pending inputs from time t.
+        params can override any neuron parameter with an array broadcastable to the
+        variables' shape. dtype defaults to the precision of the first neuron.
+        """
+        assert len(neurons) > 0
+        assert nb_members > 0
+        self.dtype = np.dtype(dtype if dtype is not None else neurons[0].dtype)
+        self.dt = neurons[0].dt
+        assert all(neuron.dt == self.dt for neuron in neurons)
+        shape = (nb_members, len(neurons))
+        params = params or {}
+        for param in ENSEMBLE_PARAMS:
+            value = params.get(param, [getattr(neuron, param) for neuron in neurons])
+            self.__setattr__(param, np.broadcast_to(np.asarray(value, dtype=self.dtype), shape))
+        self.pse_factor = (np.exp(1) / self.tau_ex).astype(self.dtype)
+        self.psi_factor = (np.exp(1) / self.tau_in).astype(self.dtype)
+        self.V_m = np.tile(
+            np.array([neuron.V_m for neuron in neurons], dtype=self.dtype), (nb_members, 1)
+        )
+        # refractory periods are counted in steps, rounded up as the neurons count them
+        t_ref = np.asarray(params.get("t_ref", [neuron.t_ref for neuron in neurons]), dtype=float)
+        self.refractory_steps = np.broadcast_to(np.ceil(t_ref / self.dt), shape).astype(np.int32)
+        self.refractory = np.tile(
+            np.ceil([neuron.refractory for neuron in neurons]).astype(np.int32), (nb_members, 1)
+        )
+        # dg_ex, dg_in, g_ex, g_in
+        neuron_state = np.stack([neuron.neuron_state for neuron in neurons], axis=1)
+        self.neuron_state = np.tile(neuron_state[:, None], (1, nb_members, 1)).astype(self.dtype)
+        self.step = neurons[0].step_index(t)
+
+        # inputs pending in the ring buffers, ordered by arrival step
+        size_buffer = max(neuron.size_buffer for neuron in neurons)
+        self.pending_exc = np.zeros((size_buffer, *shape), dtype=self.dtype)
+        self.pending_inh = np.zeros((size_buffer, *shape), dtype=self.dtype)
+        for i, neuron in enumerate(neurons):
+            size = neuron.size_buffer
+            buffer_idx = (self.step + np.arange(size)) % size
+            self.pending_exc[:size, :, i] = neuron.buffer_spikes_exc[buffer_idx, None]
+            self.pending_inh[:size, :, i] = neuron.buffer_spikes_inh[buffer_idx, None]
+
+    @property
+    def shape(self):
+        return self.V_m.shape
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the state variables and pending inputs of the ensemble.
+        """
+        arrays = [self.V_m, self.refractory, self.neuron_state, self.pending_exc, self.pending_inh]
+        return sum(array.nbytes for array in arrays)
+
+    def update(self, input_exc, input_inh):
+        dg_ex, dg_in, g_ex, g_in = self.neuron_state
+        dg_ex += input_exc * self.pse_factor
+        dg_in += input_inh * self.psi_factor
+        I_syn = g_ex * (self.V_m - self.E_ex) + g_in * (self.V_m - self.E_in)
+        dg_ex -= dg_ex / self.tau_ex * self.dt
+        dg_in -= dg_in / self.tau_in * self.dt
+        g_ex += (dg_ex - g_ex / self.tau_ex) * self.dt
+        g_in += (dg_in - g_in / self.tau_in) * self.dt
+
+        tau = self.C_m / self.g_L
+        self.V_m += (-self.V_m + self.E_L + (-I_syn + self.I_e) / self.g_L) / tau * self.dt
+        refractory = self.refractory > 0
+        self.V_m[refractory] = self.V_reset[refractory]
+        self.refractory[refractory] -= 1
+        spiked = ~refractory & (self.V_m >= self.V_th)
+        self.refractory[spiked] = self.refractory_steps[spiked]
+        self.step += 1
+        return spiked
+
+    def run(self, inputs, connectome=None, delays=None):
+        """
+        Simulate every member with its own input schedule.
+
+        inputs has a (nb_members, nb_steps, nb_neurons) shape and holds the weight of the
+        spikes arriving at each neuron at each step (positive for excitatory inputs).
+        Spikes are routed through the connectome with the delays of their target neuron.
+        Returns the membrane potentials and spike events, with the same shape as inputs.
+        """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        nb_members, nb_steps, nb_neurons = inputs.shape
+        assert (nb_members, nb_neurons) == self.shape
+        delay_steps = np.zeros(nb_neurons, dtype=int)
+        if connectome is not None:
+            assert connectome.shape == (nb_neurons, nb_neurons)
+            if delays is not None:
+                delay_steps = np.round(np.asarray(delays) / self.dt).astype(int)
+                assert np.all(delay_steps >= 1)
+            else:
+                delay_steps[:] = 1
+            connectome = np.where(np.absolute(connectome) >= 1e-3, connectome, 0.0)
+            connectome = connectome.astype(self.dtype)
+            if not connectome.any():
+                connectome = None
+
+        # inputs indexed by step since the start of the run
+        nb_pending = len(self.pending_exc)
+        nb_total = max(nb_steps, nb_pending) + delay_steps.max()
+        input_exc = np.zeros((nb_total, *self.shape), dtype=self.dtype)
+        input_inh = np.zeros((nb_total, *self.shape), dtype=self.dtype)
+        input_exc[:nb_pending] += self.pending_exc
+        input_inh[:nb_pending] += self.pending_inh
+        input_exc[:nb_steps] += np.maximum(inputs, 0.0).transpose(1, 0, 2)
+        input_inh[:nb_steps] -= np.minimum(inputs, 0.0).transpose(1, 0, 2)
+        if connectome is not None:
+            weights_exc = np.maximum(connectome, 0.0)
+            weights_inh = -np.minimum(connectome, 0.0)
+            delay_groups = [(d, delay_steps == d) for d in np.unique(delay_steps)]
+
+        v_m = np.zeros((nb_steps, *self.shape), dtype=self.dtype)
+        spikes = np.zeros((nb_steps, *self.shape), dtype=bool)
+        for j in range(nb_steps):
+            spiked = self.update(input_exc[j], input_inh[j])
+            v_m[j] = self.V_m
+            spikes[j] = spiked
+            if connectome is not None and spiked.any():
+                spiked = spiked.astype(self.dtype)
+                received_exc = spiked @ weights_exc
+                received_inh = spiked @ weights_inh
+                for delay, targets in delay_groups:
+                    input_exc[j + delay][:, targets] += received_exc[:, targets]
+                    input_inh[j + delay][:, targets] += received_inh[:, targets]
+        self.pending_exc = input_exc[nb_steps:]
+        self.pending_inh = input_inh[nb_steps:]
+        return v_m.transpose(1, 0, 2), spikes.transpose(1, 0, 2)
@@ -0,0 +1,139 @@
+import time
+from argparse import ArgumentParser
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+HEADER_SIZE = 4  # sequence number, number of neurons, spike capacity, spikes written
+
+
+def _layout(buffer, nb_neurons, spike_capacity):
+    """
+    Split the shared buffer into the header and the arrays of the feed.
+    """
+    arrays = {"header": np.ndarray(HEADER_SIZE, dtype=np.int64, buffer=buffer)}
+    offset = HEADER_SIZE * 8
+    for name, size, dtype in [
+        ("time", 1, np.float64),
+        ("V_m", nb_neurons, np.float64),
+        ("g_ex", nb_neurons, np.float64),
+        ("g_in", nb_neurons, np.float64),
+        ("spike_times", spike_capacity, np.float64),
+        ("spike_neurons", spike_capacity, np.int64),
+    ]:
+        arrays[name] = np.ndarray(size, dtype=dtype, buffer=buffer, offset=offset)
+        offset += size * 8
+    return arrays
+
+
+class StateFeed:
+    """
+    Publish the current state of a simulation in shared memory. Other processes can read it
+    with StateFeedReader without locking: the writer makes the sequence number odd while
+    writing and even once done, readers retry when it is odd or changed during their copy.
+    The latest spikes are kept in a ring of spike_capacity (time, neuron) events.
+    """
+
+    def __init__(self, nb_neurons: int, spike_capacity: int = 1024, name: str = None):
+        assert nb_neurons > 0
+        assert spike_capacity > 0
+        size = (HEADER_SIZE + 1 + 3 * nb_neurons + 2 * spike_capacity) * 8
+        self.shm = SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.arrays = _layout(self.shm.buf, nb_neurons, spike_capacity)
+        self.arrays["header"][:] = 0, nb_neurons, spike_capacity, 0
+        self.spike_capacity = spike_capacity
+        self.published_spikes = [0] * nb_neurons
+
+    def publish(self, game):
+        """
+        Write the time, V_m, conductances and new spikes of the neurons of a GameController.
+        """
+        arrays = self.arrays
+        header = arrays["header"]
+        controllers = game.controllers
+        header[0] += 1
+        arrays["time"][0] = game.current_time
+        for i, controller in enumerate(controllers):
+            neuron = controller.neuron
+            arrays["V_m"][i] = neuron.V_m
+            arrays["g_ex"][i] = neuron.neuron_state[2]
+            arrays["g_in"][i] = neuron.neuron_state[3]
+            # spike trains shrink when a snapshot is restored
+            if len(controller.spikes) < self.published_spikes[i]:
+                self.published_spikes[i] = len(controller.spikes)
+            new_spikes = controller.spikes.times[self.published_spikes[i] :]
+            if len(new_spikes) > 0:
+                new_spikes = new_spikes[-self.spike_capacity :]
+                ring_idx = (header[3] + np.arange(len(new_spikes))) % self.spike_capacity
+                arrays["spike_times"][ring_idx] = new_spikes
+                arrays["spike_neurons"][ring_idx] = i
+                header[3] += len(new_spikes)
+                self.published_spikes[i] = len(controller.spikes)
+        header[0] += 1
+
+    def close(self):
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class StateFeedReader:
+    """
+    Reference reader of a StateFeed, attached to its shared memory by name.
+    """
+
+    def __init__(self, name: str):
+        self.shm = SharedMemory(name=name)
+        # the memory belongs to the writer, which is in charge of unlinking it
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        header = np.ndarray(HEADER_SIZE, dtype=np.int64, buffer=self.shm.buf)
+        self.nb_neurons, self.spike_capacity = int(header[1]), int(header[2])
+        self.arrays = _layout(self.shm.buf, self.nb_neurons, self.spike_capacity)
+
+    def read(self, timeout: float = 1.0):
+        """
+        Return a consistent copy of the published state, with the recent spikes in the order
+        they were published.
+        """
+        header = self.arrays["header"]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            sequence = int(header[0])
+            if sequence % 2 == 0:
+                nb_spikes = int(header[3])
+                state = {k: v.copy() for k, v in self.arrays.items() if k != "header"}
+                if int(header[0]) == sequence:
+                    break
+            time.sleep(0)  # let the writer finish
+        else:
+            raise RuntimeError("Could not read a consistent state from the feed.")
+        state["time"] = float(state["time"][0])
+        nb_recent = min(nb_spikes, self.spike_capacity)
+        order = (nb_spikes - nb_recent + np.arange(nb_recent)) % self.spike_capacity
+        state["spike_times"] = state["spike_times"][order]
+        state["spike_neurons"] = state["spike_neurons"][order]
+        return state
+
+    def close(self):
+        self.arrays = None
+        self.shm.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Print the state published by a running game.")
+    parser.add_argument("name", help="Name of the shared memory of the feed")
+    parser.add_argument("-i", "--interval", type=float, default=0.5, help="in seconds")
+    args = parser.parse_args()
+    reader = StateFeedReader(args.name)
+    try:
+        while True:
+            state = reader.read()
+            v_m = ", ".join(f"{v:.2f}" for v in state["V_m"])
+            print(f"t={state['time']:.1f} ms V_m=[{v_m}] spikes={len(state['spike_times'])}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
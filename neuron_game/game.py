@@ -1,8 +1,10 @@
+from argparse import ArgumentParser
 from functools import partial
 from tkinter import LAST, LEFT, ROUND, Button, Canvas, Frame, Label, Tk
 
 import numpy as np
 
+from neuron_game.archive import MatchArchive
 from neuron_game.controller import GameController
 from neuron_game.display import EXCITATORY_BLUE, INHIBITORY_RED, PlotDisplay, ResultsDisplay
 from neuron_game.iaf_cond_alpha import IAFCondAlpha
@@ -43,6 +45,7 @@ class NeuronPanel(Panel):
         save_values=False,
         simulation_duration: float = -1.0,
         start_paused: bool = False,
+        dtype=np.float64,
     ):
         if titles is None:
             titles = ["Neuron membrane potential"]
@@ -57,7 +60,7 @@ class NeuronPanel(Panel):
         nb_neurons = len(titles)
 
         # model
-        self.neurons = [IAFCondAlpha() for _ in range(nb_neurons)]
+        self.neurons = [IAFCondAlpha(dtype=dtype) for _ in range(nb_neurons)]
         self.connectome = np.zeros((nb_neurons, nb_neurons), dtype=float)
 
         # view
@@ -68,6 +71,7 @@ class NeuronPanel(Panel):
                 ylims=[-90, -30],
                 color=color,
                 title=title,
+                dtype=dtype,
             )
             for i, (neuron, color, title) in enumerate(
                 zip(self.neurons, colors, titles, strict=False)
@@ -100,11 +104,13 @@ class NeuronPanel(Panel):
     def cleanup(self):
         self._root.unbind("<Key>")
         self.controller.cleanup()
+        for canvas in self.canvases:
+            canvas.release()
         super().cleanup()
 
 
 class MultiplayerGame(NeuronPanel):
-    def __init__(self, root):
+    def __init__(self, root, archive: MatchArchive = None):
         self.titles = ["Excitatory neuron", "Inhibitory neuron", "Target neuron"]
         self.colors = [EXCITATORY_BLUE, INHIBITORY_RED, "purple"]
         super().__init__(
@@ -126,6 +132,7 @@ class MultiplayerGame(NeuronPanel):
         self.neurons[-1].tau_in = self.neurons[-1].tau_ex
         self.neurons[-1].E_in = 2 * self.neurons[-1].E_L - self.neurons[-1].E_ex
         self.show_results = False
+        self.archive = archive
 
     def _side_display(self):
         self.side_canvases[0].grid(row=0, column=0, sticky="n")
@@ -156,13 +163,14 @@ class MultiplayerGame(NeuronPanel):
             canvas.destroy()
         for canvas in self.canvases:
             canvas.frame.grid_forget()
-            canvas.frame.destroy()
+            canvas.release()
         self._root.unbind("<Key>")
         self.canvases = [
             ResultsDisplay(
                 self.frames[0],
                 [n.save_file for n in self.controller.controllers],
                 self.neurons[0].V_th,
+                spikes=[n.spikes for n in self.controller.controllers],
                 colors=self.colors,
                 ylims=[-90, -30],
                 titles=self.titles,
@@ -192,6 +200,31 @@ class MultiplayerGame(NeuronPanel):
         winner_label.grid(row=1, column=0, sticky="nwe")
         quit_button.grid(column=0, row=2, padx=10, pady=10, sticky="n")
         self.show_results = True
+        if self.archive is not None:
+            self.archive_results(winner)
+
+    def archive_results(self, winner):
+        controllers = self.controller.controllers
+        traces = {}
+        for i, (trace, controller) in enumerate(
+            zip(self.canvases[0].traces, controllers, strict=True)
+        ):
+            traces[f"trace_{i}"] = trace
+            traces[f"spikes_{i}"] = controller.spikes.times
+        self.archive.add_match(
+            duration=self.controller.simulation_duration,
+            winner=winner,
+            target_mean=float(self.canvases[0].means[-1]),
+            players=[
+                {"key_count": c.key_count, "spike_count": len(c.spikes)} for c in controllers[:2]
+            ],
+            params={
+                "target": self.neurons[-1].get_params(),
+                "weights": self.connectome[:2, 2].tolist(),
+                "delays": self.controller.delays,
+            },
+            traces=traces,
+        )
 
     def update(self):
         if not self.has_quit:
@@ -272,7 +305,7 @@ class MainMenu(Panel):
 
 
 class NeuronGame:
-    def __init__(self):
+    def __init__(self, archive_folder: str = None):
         self.root = Tk()
         self.root.title("Neuron Simulation Game")
         self.root.columnconfigure(0, weight=1)
@@ -280,15 +313,17 @@ class NeuronGame:
         self.root.protocol("WM_DELETE_WINDOW", self.cleanup)
         self.current_display = None
         self.stopped = False
+        self.archive = MatchArchive(archive_folder) if archive_folder is not None else None
 
         current_choice = None
         while not self.stopped:
             if current_choice == 2:
                 self.root.destroy()
+                self.close()
                 break
             elif current_choice == 1:
                 self.root.geometry("1920x1075")
-                self.current_display = MultiplayerGame(self.root)
+                self.current_display = MultiplayerGame(self.root, self.archive)
             elif current_choice == 0:
                 self.root.geometry("960x620")
                 self.current_display = SingleExploration(self.root)
@@ -303,7 +338,18 @@ class NeuronGame:
     def cleanup(self):
         self.current_display.cleanup()
         self.root.destroy()
+        self.close()
+
+    def close(self):
         self.stopped = True
+        if self.archive is not None:
+            self.archive.close()
 
 
-NeuronGame()
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Simulation game of point-neurons.")
+    parser.add_argument(
+        "-a", "--archive", default=None, help="Folder where multiplayer matches are archived"
+    )
+    args = parser.parse_args()
+    NeuronGame(args.archive)
@@ -40,10 +40,19 @@ RANGES = {
     "V_th": [-50.0, -30.0],
 }
 
+STATE_VARIABLES = [*DEFAULT_PARAMS, "refractory", "I_syn"]
+
 
 class IAFCondAlpha:
-    def __init__(self, params: dict = None):
+    def __init__(self, params: dict = None, dtype=np.float64):
+        """
+        dtype sets the precision of the dynamic variables and input buffers of the neuron.
+        """
         params = params or {}
+        self.dtype = np.dtype(dtype)
+        assert self.dtype in (np.float32, np.float64)
+        # python floats are faster than numpy scalars for double precision
+        self.scalar = float if self.dtype == np.float64 else self.dtype.type
 
         new_params = DEFAULT_PARAMS.copy()
         new_params.update(params)
@@ -51,20 +60,43 @@ class IAFCondAlpha:
         for param in DEFAULT_PARAMS:
             self.__setattr__(param, new_params[param])
         self.refractory = 0
+        self.I_syn = 0.0
+        self.V_m = self.scalar(self.V_m)
 
     @property
     def pse_factor(self):
-        return np.exp(1) / self.tau_ex
+        return self.scalar(np.exp(1) / self.tau_ex)
 
     @property
     def psi_factor(self):
-        return np.exp(1) / self.tau_in
+        return self.scalar(np.exp(1) / self.tau_in)
 
     def init_buffers(self, max_delay):
         self.size_buffer = int(max_delay / self.dt + 1)
-        self.buffer_spikes_exc = np.zeros(self.size_buffer)
-        self.buffer_spikes_inh = np.zeros(self.size_buffer)
-        self.neuron_state = np.zeros(4)  # dg_ex, dg_in, g_ex, g_in
+        self.buffer_spikes_exc = np.zeros(self.size_buffer, dtype=self.dtype)
+        self.buffer_spikes_inh = np.zeros(self.size_buffer, dtype=self.dtype)
+        self.neuron_state = np.zeros(4, dtype=self.dtype)  # dg_ex, dg_in, g_ex, g_in
+
+    def resize_buffers(self, max_delay, t):
+        """
+        Grow the input ring buffers, keeping the inputs pending from time t.
+        """
+        size_buffer = int(max_delay / self.dt + 1)
+        if size_buffer <= self.size_buffer:
+            return
+        steps = self.step_index(t) + np.arange(self.size_buffer)
+        old_idx = steps % self.size_buffer
+        new_idx = steps % size_buffer
+        buffer_exc = np.zeros(size_buffer, dtype=self.dtype)
+        buffer_inh = np.zeros(size_buffer, dtype=self.dtype)
+        buffer_exc[new_idx] = self.buffer_spikes_exc[old_idx]
+        buffer_inh[new_idx] = self.buffer_spikes_inh[old_idx]
+        self.size_buffer = size_buffer
+        self.buffer_spikes_exc = buffer_exc
+        self.buffer_spikes_inh = buffer_inh
+
+    def step_index(self, t):
+        return int(round(t / self.dt))
 
     def _test_params(self, params: dict):
         assert params["C_m"] > 0.0
@@ -96,13 +128,13 @@ class IAFCondAlpha:
 
     def update(self, t):
         spiked = False
-        buffer_idx = int(t / self.dt) % self.size_buffer
+        buffer_idx = self.step_index(t) % self.size_buffer
         self.I_syn = self.update_i_syn(
             self.buffer_spikes_exc[buffer_idx], self.buffer_spikes_inh[buffer_idx]
         )
-        self.V_m += self.update_v_m() * self.dt
+        self.V_m = self.scalar(self.V_m + self.update_v_m() * self.dt)
         if self.refractory > 0:
-            self.V_m = self.V_reset
+            self.V_m = self.scalar(self.V_reset)
             self.refractory -= 1
         elif self.V_m >= self.V_th:
             self.refractory = self.t_ref / self.dt
@@ -112,13 +144,89 @@ class IAFCondAlpha:
 
         return spiked
 
+    def run_block(self, t, nb_steps, v_m=None):
+        """
+        Run update for nb_steps steps starting at time t, assuming that no input is received
+        in between, with the neuron variables kept in local variables.
+        Returns the indices of the steps at which the neuron spiked. V_m after each step is
+        also stored in v_m when provided.
+        """
+        dt = self.dt
+        scalar = self.scalar
+        rounded = self.dtype != np.float64
+        tau = self.C_m / self.g_L
+        tau_ex, tau_in = self.tau_ex, self.tau_in
+        pse_factor, psi_factor = self.pse_factor, self.psi_factor
+        E_ex, E_in, E_L, I_e, g_L = self.E_ex, self.E_in, self.E_L, self.I_e, self.g_L
+        V_reset, V_th = scalar(self.V_reset), self.V_th
+        dg_ex, dg_in, g_ex, g_in = (scalar(x) for x in self.neuron_state)
+        V_m, refractory, I_syn = self.V_m, self.refractory, self.I_syn
+        buffer_exc, buffer_inh = self.buffer_spikes_exc, self.buffer_spikes_inh
+        first_idx = self.step_index(t)
+        spikes = []
+        for k in range(nb_steps):
+            buffer_idx = (first_idx + k) % self.size_buffer
+            dg_ex += buffer_exc[buffer_idx] * pse_factor
+            dg_in += buffer_inh[buffer_idx] * psi_factor
+            buffer_exc[buffer_idx] = 0
+            buffer_inh[buffer_idx] = 0
+            I_syn = g_ex * (V_m - E_ex) + g_in * (V_m - E_in)
+            dg_ex -= dg_ex / tau_ex * dt
+            dg_in -= dg_in / tau_in * dt
+            g_ex += (dg_ex - g_ex / tau_ex) * dt
+            g_in += (dg_in - g_in / tau_in) * dt
+            V_m += (-V_m + E_L + (-I_syn + I_e) / g_L) / tau * dt
+            if rounded:
+                dg_ex, dg_in, g_ex, g_in, V_m = map(scalar, (dg_ex, dg_in, g_ex, g_in, V_m))
+            if refractory > 0:
+                V_m = V_reset
+                refractory -= 1
+            elif V_m >= V_th:
+                refractory = self.t_ref / dt
+                spikes.append(k)
+            if v_m is not None:
+                v_m[k] = V_m
+        self.neuron_state[:] = dg_ex, dg_in, g_ex, g_in
+        self.V_m, self.refractory, self.I_syn = V_m, refractory, I_syn
+        return spikes
+
     def receive_spike(self, t, weight, delay):
-        buffer_idx = int((t + delay) / self.dt) % self.size_buffer
+        buffer_idx = self.step_index(t + delay) % self.size_buffer
         if weight > 0:
             self.buffer_spikes_exc[buffer_idx] += weight
         else:
             self.buffer_spikes_inh[buffer_idx] -= weight
 
+    def receive_block(self, t, inputs_exc, inputs_inh):
+        """
+        Add per-step excitatory and inhibitory inputs for the steps starting at time t.
+        Both arrays hold positive weights and must fit in the ring buffers.
+        """
+        assert len(inputs_exc) == len(inputs_inh) <= self.size_buffer
+        buffer_idx = (self.step_index(t) + np.arange(len(inputs_exc))) % self.size_buffer
+        self.buffer_spikes_exc[buffer_idx] += inputs_exc
+        self.buffer_spikes_inh[buffer_idx] += inputs_inh
+
+    def get_state(self):
+        """
+        Return the parameters, dynamic variables and input buffers of the neuron as arrays.
+        """
+        return {
+            "values": np.array([getattr(self, k) for k in STATE_VARIABLES], dtype=float),
+            "neuron_state": self.neuron_state.copy(),
+            "buffer_exc": self.buffer_spikes_exc.copy(),
+            "buffer_inh": self.buffer_spikes_inh.copy(),
+        }
+
+    def set_state(self, state: dict):
+        for k, v in zip(STATE_VARIABLES, state["values"], strict=True):
+            self.__setattr__(k, float(v))
+        self.V_m = self.scalar(self.V_m)
+        self.neuron_state = np.array(state["neuron_state"], dtype=self.dtype)
+        self.buffer_spikes_exc = np.array(state["buffer_exc"], dtype=self.dtype)
+        self.buffer_spikes_inh = np.array(state["buffer_inh"], dtype=self.dtype)
+        self.size_buffer = len(self.buffer_spikes_exc)
+
     def get_params(self):
         return {
             "C_m": self.C_m,
@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class BackgroundInput(ABC):
+    """
+    Source of background spikes, generated in bulk for a time horizon (in ms).
+    Positive weights are excitatory, negative ones inhibitory.
+    """
+
+    def __init__(self, weight: float, horizon: float = 10.0, seed=None):
+        assert weight != 0.0
+        assert horizon > 0.0
+        self.weight = weight
+        self.horizon = horizon
+        self.rng = np.random.default_rng(seed)
+
+    @abstractmethod
+    def spike_times(self, t_start: float, t_stop: float):
+        """
+        Return the sorted spike times of the source within [t_start, t_stop).
+        """
+
+    def binned(self, t_start: float, n_steps: int, dt: float):
+        """
+        Return the summed spike weight received at each of the n_steps starting at t_start.
+        """
+        times = self.spike_times(t_start, t_start + n_steps * dt)
+        steps = np.clip(np.floor((times - t_start) / dt).astype(int), 0, n_steps - 1)
+        return np.bincount(steps, minlength=n_steps) * self.weight
+
+
+class PoissonInput(BackgroundInput):
+    def __init__(self, rate: float, weight: float, horizon: float = 10.0, seed=None):
+        assert rate >= 0.0
+        super().__init__(weight, horizon, seed)
+        self.rate = rate  # in Hz
+
+    def spike_times(self, t_start, t_stop):
+        nb_spikes = self.rng.poisson(self.rate * (t_stop - t_start) / 1000.0)
+        return np.sort(self.rng.uniform(t_start, t_stop, nb_spikes))
+
+
+class InhomogeneousPoissonInput(BackgroundInput):
+    def __init__(self, rates, rate_dt: float, weight: float, horizon: float = 10.0, seed=None):
+        """
+        Poisson source whose rate (in Hz) changes every rate_dt ms following rates.
+        The rate profile is repeated once its end is reached.
+        """
+        rates = np.asarray(rates, dtype=float)
+        assert rates.ndim == 1 and len(rates) > 0
+        assert np.all(rates >= 0.0)
+        assert rate_dt > 0.0
+        super().__init__(weight, horizon, seed)
+        self.rates = rates
+        self.rate_dt = rate_dt
+        self.max_rate = float(np.max(rates))
+
+    def spike_times(self, t_start, t_stop):
+        # thinning of a homogeneous process at the maximum rate
+        nb_spikes = self.rng.poisson(self.max_rate * (t_stop - t_start) / 1000.0)
+        times = np.sort(self.rng.uniform(t_start, t_stop, nb_spikes))
+        rates = self.rates[np.floor(times / self.rate_dt).astype(int) % len(self.rates)]
+        return times[self.rng.uniform(0.0, self.max_rate, nb_spikes) < rates]
+
+
+class RegularInput(BackgroundInput):
+    def __init__(self, rate: float, weight: float, start: float = 0.0, horizon: float = 10.0):
+        assert rate > 0.0
+        super().__init__(weight, horizon)
+        self.period = 1000.0 / rate
+        self.start = start
+
+    def spike_times(self, t_start, t_stop):
+        first = max(np.ceil((t_start - self.start) / self.period), 0)
+        last = max(np.ceil((t_stop - self.start) / self.period), first)
+        return self.start + np.arange(first, last) * self.period
+
+
+class SpikeFileInput(BackgroundInput):
+    def __init__(self, filename: str, weight: float, horizon: float = 10.0):
+        """
+        Replay the spike times (in ms) stored in the first column of a text file.
+        """
+        super().__init__(weight, horizon)
+        self.times = np.sort(np.loadtxt(filename, usecols=0, ndmin=1))
+
+    def spike_times(self, t_start, t_stop):
+        start, stop = np.searchsorted(self.times, [t_start, t_stop], side="left")
+        return self.times[start:stop]
@@ -0,0 +1,57 @@
+from time import perf_counter
+
+import numpy as np
+
+LATENCY_STAGES = ["stimulus", "display"]
+
+
+class LatencyMonitor:
+    """
+    Keep the latest latencies (in ms) measured from a keypress to each stage of its handling:
+    the stimulus sent to the neuron and the refreshed plot of that neuron.
+    Keypresses are timed from the timestamp of their Tk event, so latencies include the time
+    the event waited in the Tk queue.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        assert capacity > 0
+        self.capacity = capacity
+        self.samples = {stage: np.zeros(capacity) for stage in LATENCY_STAGES}
+        self.counts = dict.fromkeys(LATENCY_STAGES, 0)
+        self.event_offset = None  # perf_counter time of the Tk event clock origin, in s
+
+    @staticmethod
+    def now():
+        return perf_counter()
+
+    def event_time(self, event_time: int):
+        """
+        Convert the timestamp of a Tk event (in ms, from the X server clock) to perf_counter
+        time. Events are handled after they are emitted, so the smallest difference seen
+        between both clocks is the best estimate of their offset.
+        """
+        offset = perf_counter() - event_time / 1e3
+        if self.event_offset is None or offset < self.event_offset:
+            self.event_offset = offset
+        return event_time / 1e3 + self.event_offset
+
+    def record(self, stage: str, start: float):
+        self.samples[stage][self.counts[stage] % self.capacity] = (perf_counter() - start) * 1e3
+        self.counts[stage] += 1
+
+    def latencies(self, stage: str):
+        return self.samples[stage][: min(self.counts[stage], self.capacity)]
+
+    def percentiles(self, q=(50, 90, 99)):
+        """
+        Return for each stage the requested percentiles of its latencies, in ms.
+        """
+        results = {}
+        for stage in LATENCY_STAGES:
+            if self.counts[stage] > 0:
+                values = np.percentile(self.latencies(stage), q)
+                results[stage] = {k: float(v) for k, v in zip(q, values, strict=True)}
+        return results
+
+    def reset(self):
+        self.counts = dict.fromkeys(LATENCY_STAGES, 0)
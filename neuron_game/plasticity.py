@@ -0,0 +1,136 @@
+import copy
+from os import makedirs
+from os.path import join
+
+import numpy as np
+
+
+def _ranges(ptr, order, neurons):
+    """
+    Return the synapses listed in order between ptr[n] and ptr[n + 1] for each neuron n.
+    """
+    starts = ptr[neurons]
+    lengths = ptr[neurons + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return order[offsets + np.arange(lengths.sum())]
+
+
+class STDP:
+    """
+    Spike-timing-dependent plasticity of the synapses of a connectome, based on exponential
+    pre- and post-synaptic traces. Only the synapses existing when the rule is created
+    (absolute weight above 1e-3) are plastic. Inhibitory synapses keep their sign, the rule
+    applies to their absolute weight.
+    """
+
+    def __init__(
+        self,
+        connectome,
+        tau_plus: float = 20.0,
+        tau_minus: float = 20.0,
+        a_plus: float = 1.0,
+        a_minus: float = 1.05,
+        w_max: float = 200.0,
+        snapshot_interval: float = -1.0,
+        snapshot_dir: str = None,
+    ):
+        assert tau_plus > 0.0
+        assert tau_minus > 0.0
+        assert w_max > 0.0
+        assert snapshot_interval <= 0.0 or snapshot_dir is not None
+        self.connectome = connectome
+        self.tau_plus = tau_plus
+        self.tau_minus = tau_minus
+        self.a_plus = a_plus
+        self.a_minus = a_minus
+        self.w_max = w_max
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_dir = snapshot_dir
+        self.next_snapshot = snapshot_interval
+
+        nb_neurons = len(connectome)
+        self.sources, self.targets = np.nonzero(np.absolute(connectome) >= 1e-3)
+        weights = connectome[self.sources, self.targets]
+        self.signs = np.sign(weights)
+        self.weights = np.absolute(weights)
+        # synapses grouped by source (outgoing) and by target (incoming)
+        self.out_order = np.argsort(self.sources, kind="stable")
+        self.out_ptr = np.searchsorted(self.sources[self.out_order], np.arange(nb_neurons + 1))
+        self.in_order = np.argsort(self.targets, kind="stable")
+        self.in_ptr = np.searchsorted(self.targets[self.in_order], np.arange(nb_neurons + 1))
+
+        # traces are decayed lazily, from the time of their last update
+        self.pre_trace = np.zeros(nb_neurons)
+        self.post_trace = np.zeros(nb_neurons)
+        self.last_spike = np.zeros(nb_neurons)
+
+    def update(self, t: float, spiked):
+        """
+        Update the synapses of the neurons that spiked at time t.
+        """
+        spiked = np.asarray(spiked, dtype=int)
+        if len(spiked) > 0:
+            elapsed = t - self.last_spike
+            # post-synaptic spikes potentiate incoming synapses
+            synapses = _ranges(self.in_ptr, self.in_order, spiked)
+            sources = self.sources[synapses]
+            self.weights[synapses] += (
+                self.a_plus * self.pre_trace[sources] * np.exp(-elapsed[sources] / self.tau_plus)
+            )
+            # pre-synaptic spikes depress outgoing synapses
+            out_synapses = _ranges(self.out_ptr, self.out_order, spiked)
+            targets = self.targets[out_synapses]
+            self.weights[out_synapses] -= (
+                self.a_minus * self.post_trace[targets] * np.exp(-elapsed[targets] / self.tau_minus)
+            )
+
+            synapses = np.concatenate([synapses, out_synapses])
+            self.weights[synapses] = np.clip(self.weights[synapses], 0.0, self.w_max)
+            self.connectome[self.sources[synapses], self.targets[synapses]] = (
+                self.signs[synapses] * self.weights[synapses]
+            )
+
+            self.pre_trace[spiked] = (
+                self.pre_trace[spiked] * np.exp(-elapsed[spiked] / self.tau_plus) + 1.0
+            )
+            self.post_trace[spiked] = (
+                self.post_trace[spiked] * np.exp(-elapsed[spiked] / self.tau_minus) + 1.0
+            )
+            self.last_spike[spiked] = t
+        if self.snapshot_interval > 0.0 and self.next_snapshot <= t:
+            self.save_weights(t)
+            self.next_snapshot += self.snapshot_interval
+
+    def get_state(self):
+        return {
+            "weights": self.weights.copy(),
+            "pre_trace": self.pre_trace.copy(),
+            "post_trace": self.post_trace.copy(),
+            "last_spike": self.last_spike.copy(),
+            "next_snapshot": self.next_snapshot,
+        }
+
+    def set_state(self, state: dict):
+        assert len(state["weights"]) == len(self.weights)
+        assert len(state["pre_trace"]) == len(self.pre_trace)
+        self.weights = np.array(state["weights"], dtype=float)
+        self.pre_trace = np.array(state["pre_trace"], dtype=float)
+        self.post_trace = np.array(state["post_trace"], dtype=float)
+        self.last_spike = np.array(state["last_spike"], dtype=float)
+        self.next_snapshot = float(state["next_snapshot"])
+
+    def copy(self, connectome):
+        """
+        Return a copy of the rule, applied to another connectome with the same synapses.
+        """
+        assert connectome.shape == self.connectome.shape
+        return copy.deepcopy(self, {id(self.connectome): connectome})
+
+    def save_weights(self, t: float):
+        makedirs(self.snapshot_dir, exist_ok=True)
+        np.savez(
+            join(self.snapshot_dir, f"weights_{t:.1f}.npz"),
+            sources=self.sources,
+            targets=self.targets,
+            weights=self.signs * self.weights,
+        )
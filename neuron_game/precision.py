@@ -0,0 +1,212 @@
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+from neuron_game.controller import GameController
+from neuron_game.ensemble import NeuronEnsemble
+from neuron_game.iaf_cond_alpha import IAFCondAlpha
+from neuron_game.inputs import PoissonInput
+
+
+def _population(nb_neurons: int, dt: float, dtype, params: dict = None):
+    neuron = IAFCondAlpha(params, dtype=dtype)
+    neuron.dt = dt
+    neuron.init_buffers(dt)
+    return NeuronEnsemble([neuron], nb_neurons, 0.0)
+
+
+def _game(nb_neurons: int, dtype, rate: float, weight: float, seed: int):
+    neurons = [IAFCondAlpha(dtype=dtype) for _ in range(nb_neurons)]
+    game = GameController([None] * nb_neurons, neurons, [False] * nb_neurons, [0] * nb_neurons)
+    for i, controller in enumerate(game.controllers):
+        controller.add_background_input(PoissonInput(rate, weight, seed=[seed, i, 0]))
+        controller.add_background_input(PoissonInput(rate, -weight, seed=[seed, i, 1]))
+    return game
+
+
+def _spike_stats(ref_trains: list, test_trains: list):
+    """
+    Spike count mismatch and spike time jitter (in ms) of the neurons that spiked as many
+    times in both runs, from their spike times.
+    """
+    ref_counts = np.array([len(train) for train in ref_trains])
+    test_counts = np.array([len(train) for train in test_trains])
+    same_count = np.flatnonzero((ref_counts == test_counts) & (ref_counts > 0))
+    jitter = np.concatenate(
+        [np.absolute(ref_trains[i] - test_trains[i]) for i in same_count] or [np.zeros(0)]
+    )
+    return {
+        "reference_spikes": int(ref_counts.sum()),
+        "spike_count_mismatch": int(np.absolute(ref_counts - test_counts).sum()),
+        "mean_spike_jitter": float(jitter.mean()) if len(jitter) > 0 else 0.0,
+        "max_spike_jitter": float(jitter.max()) if len(jitter) > 0 else 0.0,
+    }
+
+
+def compare_precision(
+    nb_neurons: int = 1000,
+    duration: float = 1000.0,
+    dtype=np.float32,
+    rate: float = 10000.0,
+    weight: float = 60.0,
+    dt: float = 0.1,
+    seed: int = 0,
+):
+    """
+    Simulate a population of independent neurons driven by excitatory and inhibitory Poisson
+    inputs (rate in Hz) in dtype and in the float64 reference, with the same inputs.
+    Returns the V_m error and the spike count mismatch and spike time jitter (in ms) of the
+    neurons that spiked as many times in both runs.
+    """
+    rng = np.random.default_rng(seed)
+    reference = _population(nb_neurons, dt, np.float64)
+    tested = _population(nb_neurons, dt, dtype)
+    nb_steps = int(round(duration / dt))
+    max_error = 0.0
+    squared_error = 0.0
+    spikes = [[], []]
+    for step in range(nb_steps):
+        inputs = rng.poisson(rate * dt / 1000.0, (2, nb_neurons, 1)) * weight
+        for i, ensemble in enumerate([reference, tested]):
+            spiked = ensemble.update(*inputs.astype(ensemble.dtype))
+            neurons = np.flatnonzero(spiked)
+            spikes[i].append(np.column_stack([neurons, np.full(len(neurons), step)]))
+        error = np.absolute(reference.V_m - tested.V_m.astype(np.float64))
+        max_error = max(max_error, float(error.max()))
+        squared_error += float(np.sum(error**2))
+
+    # spike times of each neuron, in time order
+    trains = []
+    for events in spikes:
+        events = np.concatenate(events)
+        order = np.lexsort((events[:, 1], events[:, 0]))
+        counts = np.bincount(events[:, 0], minlength=nb_neurons)
+        trains.append(np.split(events[order, 1] * dt, np.cumsum(counts)[:-1]))
+    return {
+        "max_V_m_error": max_error,
+        "rms_V_m_error": float(np.sqrt(squared_error / (nb_steps * nb_neurons))),
+        **_spike_stats(*trains),
+    }
+
+
+def compare_game_precision(
+    nb_neurons: int = 50,
+    duration: float = 1000.0,
+    dtype=np.float32,
+    rate: float = 10000.0,
+    weight: float = 60.0,
+    seed: int = 0,
+):
+    """
+    Same comparison as compare_precision for single neurons simulated by a GameController,
+    each driven by its own excitatory and inhibitory Poisson background inputs.
+    """
+    reference = _game(nb_neurons, np.float64, rate, weight, seed)
+    tested = _game(nb_neurons, dtype, rate, weight, seed)
+    nb_steps = int(round(duration / reference.dt))
+    max_error = 0.0
+    squared_error = 0.0
+    for _ in range(nb_steps):
+        reference.run(reference.dt)
+        tested.run(tested.dt)
+        error = np.absolute(
+            [
+                float(a.neuron.V_m) - float(b.neuron.V_m)
+                for a, b in zip(reference.controllers, tested.controllers, strict=True)
+            ]
+        )
+        max_error = max(max_error, float(error.max()))
+        squared_error += float(np.sum(error**2))
+    return {
+        "max_V_m_error": max_error,
+        "rms_V_m_error": float(np.sqrt(squared_error / (nb_steps * nb_neurons))),
+        **_spike_stats(
+            [controller.spikes.times for controller in reference.controllers],
+            [controller.spikes.times for controller in tested.controllers],
+        ),
+    }
+
+
+def benchmark_precision(
+    nb_neurons: int = 100000,
+    nb_steps: int = 1000,
+    dtype=np.float64,
+    rate: float = 10000.0,
+    weight: float = 60.0,
+    dt: float = 0.1,
+    seed: int = 0,
+):
+    """
+    Measure the memory used by the state of a population and its simulation speed in dtype.
+    Inputs are drawn beforehand for a few steps and replayed, so that only the neuron
+    updates are timed.
+    """
+    rng = np.random.default_rng(seed)
+    ensemble = _population(nb_neurons, dt, dtype)
+    inputs = (rng.poisson(rate * dt / 1000.0, (10, 2, nb_neurons, 1)) * weight).astype(dtype)
+    start = time.perf_counter()
+    for step in range(nb_steps):
+        ensemble.update(*inputs[step % len(inputs)])
+    elapsed = time.perf_counter() - start
+    return {"nbytes": ensemble.nbytes, "steps_per_second": nb_steps / elapsed}
+
+
+def benchmark_game_precision(
+    nb_neurons: int = 50,
+    duration: float = 200.0,
+    dtype=np.float64,
+    rate: float = 10000.0,
+    weight: float = 60.0,
+    seed: int = 0,
+):
+    """
+    Measure the memory used by the arrays of single neurons simulated by a GameController and
+    its simulation speed in dtype. The background inputs are drawn during the timed run.
+    """
+    game = _game(nb_neurons, dtype, rate, weight, seed)
+    nb_steps = int(round(duration / game.dt))
+    start = time.perf_counter()
+    game.run(duration)
+    elapsed = time.perf_counter() - start
+    nbytes = sum(
+        array.nbytes
+        for neuron in [controller.neuron for controller in game.controllers]
+        for array in [neuron.neuron_state, neuron.buffer_spikes_exc, neuron.buffer_spikes_inh]
+    )
+    return {"nbytes": nbytes, "steps_per_second": nb_steps / elapsed}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare float32 and float64 neuron simulations.")
+    parser.add_argument("-n", "--nb-neurons", type=int, default=1000)
+    parser.add_argument("-d", "--duration", type=float, default=1000.0, help="in ms")
+    parser.add_argument("-b", "--benchmark-neurons", type=int, default=100000)
+    parser.add_argument("-g", "--game-neurons", type=int, default=50)
+    args = parser.parse_args()
+    runs = [
+        (
+            "NeuronEnsemble",
+            compare_precision,
+            args.nb_neurons,
+            benchmark_precision,
+            args.benchmark_neurons,
+        ),
+        (
+            "GameController",
+            compare_game_precision,
+            args.game_neurons,
+            benchmark_game_precision,
+            args.game_neurons,
+        ),
+    ]
+    for name, compare, nb_compared, benchmark, nb_benchmarked in runs:
+        print(name)
+        for key, value in compare(nb_compared, args.duration).items():
+            print(f"  {key}: {value:g}")
+        for dtype in [np.float64, np.float32]:
+            results = benchmark(nb_benchmarked, dtype=dtype)
+            print(
+                f"  {np.dtype(dtype).name}: {results['nbytes'] / 1e6:.3f} MB, "
+                f"{results['steps_per_second']:.0f} steps/s"
+            )
@@ -0,0 +1,256 @@
+import warnings
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os import cpu_count, makedirs
+from os.path import getmtime, isfile, join, splitext
+from shutil import which
+from subprocess import PIPE, Popen
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+
+from neuron_game.display import _set_spike_times, _spike_collection
+from neuron_game.spikes import SpikeTrain
+
+VIDEO_EXTENSIONS = [".mp4", ".mkv", ".avi", ".webm", ".gif"]
+PARSE_CHUNK_ROWS = 1 << 20
+
+_session = {}  # figure of the current worker process
+
+
+def _load_spikes(spike_files: list[str], nb_traces: int):
+    spike_files = spike_files or [None] * nb_traces
+    assert len(spike_files) == nb_traces
+    spikes = []
+    for filename in spike_files:
+        spikes.append(SpikeTrain())
+        if filename is not None and isfile(filename):
+            spikes[-1].extend(np.loadtxt(filename, ndmin=1))
+    return spikes
+
+
+def load_session(trace_files: list[str], spike_files: list[str] = None):
+    """
+    Load the membrane potential traces (time and V_m columns) and spike logs (one spike
+    time per line) recorded by NeuronController. Traces are converted to npy files (see
+    convert_trace) and mapped in memory. Spike logs are only written once the neuron spiked,
+    so missing ones are considered empty.
+    """
+    traces = [np.load(convert_trace(filename), mmap_mode="r") for filename in trace_files]
+    return traces, _load_spikes(spike_files, len(trace_files))
+
+
+def _count_lines(filename: str):
+    nb_lines = 0
+    last = b"\n"
+    with open(filename, "rb") as f:
+        while block := f.read(1 << 24):
+            nb_lines += block.count(b"\n")
+            last = block[-1:]
+    return nb_lines + (last != b"\n")
+
+
+def convert_trace(filename: str):
+    """
+    Convert a membrane potential trace (time and V_m columns) to a npy file next to it,
+    parsing it by chunks. The conversion is skipped if an up-to-date npy file exists.
+    Returns the path of the npy file.
+    """
+    if filename.endswith(".npy"):
+        return filename
+    npy_file = splitext(filename)[0] + ".npy"
+    if isfile(npy_file) and getmtime(npy_file) >= getmtime(filename):
+        return npy_file
+    trace = np.lib.format.open_memmap(
+        npy_file, mode="w+", dtype=np.float64, shape=(_count_lines(filename), 2)
+    )
+    with open(filename) as f:
+        for start in range(0, len(trace), PARSE_CHUNK_ROWS):
+            stop = min(start + PARSE_CHUNK_ROWS, len(trace))
+            trace[start:stop] = np.loadtxt(f, max_rows=stop - start, ndmin=2)
+    trace.flush()
+    del trace
+    return npy_file
+
+
+def _build_figure(nb_traces, titles, colors, ylims, figsize, dpi):
+    figure = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.subplots(nb_traces, 1, sharex=True, sharey=True, squeeze=False)[:, 0]
+    lines = []
+    spike_lines = []
+    for ax, title, color in zip(axes, titles, colors, strict=True):
+        (line,) = ax.plot([], [], color=color, linewidth=2.0)
+        lines.append(line)
+        spike_lines.append(_spike_collection(ax))
+        ax.set_ylabel("Membrane potential (mV)")
+        ax.set_xlabel("Time (ms)")
+        ax.set_title(title)
+    axes[0].set_ylim(ylims)
+    figure.tight_layout()
+    return figure, canvas, axes, lines, spike_lines
+
+
+def _init_worker(trace_files, spikes, titles, colors, window, ylims, figsize, dpi):
+    figure, canvas, axes, lines, spike_lines = _build_figure(
+        len(trace_files), titles, colors, ylims, figsize, dpi
+    )
+    _session.update(
+        # traces are mapped, each frame only reads its own time window
+        traces=[np.load(filename, mmap_mode="r") for filename in trace_files],
+        spikes=spikes,
+        window=window,
+        canvas=canvas,
+        axes=axes,
+        lines=lines,
+        spike_lines=spike_lines,
+    )
+
+
+def _render_frames(frame_times, filenames=None):
+    """
+    Draw the frames of the session at each time. Frames are saved as PNG when filenames are
+    provided, otherwise their raw RGBA buffers are returned.
+    """
+    window = _session["window"]
+    canvas = _session["canvas"]
+    frames = []
+    for i, t in enumerate(frame_times):
+        for trace, spikes, line, spike_lines in zip(
+            _session["traces"],
+            _session["spikes"],
+            _session["lines"],
+            _session["spike_lines"],
+            strict=True,
+        ):
+            if len(trace) == 0:
+                continue
+            start, stop = np.searchsorted(trace[:, 0], [t - window, t], side="right")
+            line.set_data(trace[start:stop, 0], trace[start:stop, 1])
+            _set_spike_times(spike_lines, spikes.window(t - window, t))
+        _session["axes"][0].set_xlim([t - window, t + window])
+        canvas.draw()
+        if filenames is not None:
+            imsave(filenames[i], np.asarray(canvas.buffer_rgba()))
+        else:
+            frames.append(bytes(canvas.buffer_rgba()))
+    return frames
+
+
+def render_session(
+    trace_files: list[str],
+    output: str,
+    spike_files: list[str] = None,
+    titles: list[str] = None,
+    colors: list[str] = None,
+    frame_interval: float = 0.5,
+    window: float = 5.0,
+    fps: int = 25,
+    ylims: list[float] = None,
+    figsize: tuple[float, float] = (9.7, 6.0),
+    dpi: int = 100,
+    processes: int = None,
+    chunk_size: int = 64,
+    max_buffered_bytes: int = 1 << 29,
+):
+    """
+    Render a recorded session offline, one frame every frame_interval ms of simulation,
+    showing the last window ms of each trace. Frames are drawn in parallel by a pool of
+    processes and written as PNG files in the output directory, or piped to ffmpeg when
+    output is a video file and ffmpeg is installed.
+    Traces are first converted to npy files (see convert_trace) that the workers map, and at
+    most max_buffered_bytes of raw frames wait to be piped to ffmpeg.
+    Returns the path of the written output.
+    """
+    assert len(trace_files) > 0
+    assert frame_interval > 0.0 and window > 0.0 and chunk_size > 0
+    titles = titles or [f"Neuron {i}" for i in range(len(trace_files))]
+    colors = colors or ["blue"] * len(trace_files)
+    ylims = ylims or [-90.0, -30.0]
+    assert len(titles) == len(colors) == len(trace_files)
+    processes = processes or cpu_count() or 1
+    spikes = _load_spikes(spike_files, len(trace_files))
+    context = get_context("spawn")
+    with ProcessPoolExecutor(min(processes, len(trace_files)), mp_context=context) as executor:
+        trace_files = list(executor.map(convert_trace, trace_files))
+    t_end = 0.0
+    for filename in trace_files:
+        trace = np.load(filename, mmap_mode="r")
+        if len(trace) > 0:
+            t_end = max(t_end, float(trace[-1, 0]))
+    frame_times = np.arange(0.0, t_end + frame_interval / 2, frame_interval)
+
+    encoder = None
+    if splitext(output)[1].lower() in VIDEO_EXTENSIONS:
+        encoder = which("ffmpeg")
+        if encoder is None:
+            warnings.warn("ffmpeg not found, writing PNG frames instead.", stacklevel=2)
+            output = splitext(output)[0]
+    width, height = FigureCanvasAgg(Figure(figsize=figsize, dpi=dpi)).get_width_height()
+    max_pending = 2 * processes
+    if encoder is not None:
+        # chunks are shrunk so that every worker stays busy within the buffer size
+        max_frames = max(1, max_buffered_bytes // (width * height * 4))
+        chunk_size = max(1, min(chunk_size, max_frames // max_pending))
+        max_pending = max(1, min(max_pending, max_frames // chunk_size))
+    chunks = [frame_times[i : i + chunk_size] for i in range(0, len(frame_times), chunk_size)]
+
+    # spawned workers do not inherit the pipe to the encoder, which would keep it open
+    with ProcessPoolExecutor(
+        processes,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(trace_files, spikes, titles, colors, window, ylims, figsize, dpi),
+    ) as executor:
+        if encoder is None:
+            makedirs(output, exist_ok=True)
+            filenames = [join(output, f"frame_{i:06d}.png") for i in range(len(frame_times))]
+            futures = [
+                executor.submit(
+                    _render_frames, chunk, filenames[i * chunk_size : (i + 1) * chunk_size]
+                )
+                for i, chunk in enumerate(chunks)
+            ]
+            for future in futures:
+                future.result()
+            return output
+
+        input_args = f"-f rawvideo -pix_fmt rgba -s {width}x{height} -r {fps} -i -"
+        command = [encoder, "-y", "-loglevel", "error", *input_args.split()]
+        command += ["-pix_fmt", "yuv420p", output]
+        with Popen(command, stdin=PIPE) as process:
+            # keep a bounded number of chunks in flight, written in order
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_render_frames, chunk))
+                if len(pending) >= max_pending:
+                    process.stdin.writelines(pending.popleft().result())
+            while pending:
+                process.stdin.writelines(pending.popleft().result())
+            process.stdin.close()
+    return output
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Render a recorded neuron-game session.")
+    parser.add_argument("traces", nargs="+", help="Membrane potential files (vm_*.txt or .npy)")
+    parser.add_argument("-s", "--spikes", nargs="+", help="Spike files (spikes_*.txt)")
+    parser.add_argument("-o", "--output", required=True, help="Frames folder or video file")
+    parser.add_argument("-j", "--processes", type=int, default=None)
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--frame-interval", type=float, default=0.5, help="in ms")
+    args = parser.parse_args()
+    print(
+        render_session(
+            args.traces,
+            args.output,
+            spike_files=args.spikes,
+            frame_interval=args.frame_interval,
+            fps=args.fps,
+            processes=args.processes,
+        )
+    )
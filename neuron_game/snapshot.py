@@ -0,0 +1,156 @@
+import json
+import os
+from io import BytesIO
+
+import numpy as np
+
+
+def _concatenate(arrays):
+    """
+    Pack a list of 1d arrays into a flat array and the offsets to split it back.
+    """
+    sizes = np.array([len(a) for a in arrays], dtype=np.int64)
+    flat = np.concatenate(arrays) if len(arrays) > 0 else np.zeros(0)
+    return flat, np.cumsum(sizes)[:-1]
+
+
+def _log_sizes(controller):
+    """
+    Sizes of the membrane potential and spike logs written so far by a NeuronController.
+    """
+    if not controller.save_values:
+        return [0, 0]
+    files = [controller.save_file, controller.spike_file]
+    return [os.path.getsize(f) if os.path.exists(f) else 0 for f in files]
+
+
+def dump_state(game) -> bytes:
+    """
+    Serialize the full simulation state of a GameController into a binary blob.
+    Widgets and background input generators are not stored, only their state.
+    The state of the plasticity rule is stored along with the connectome it changes, and the
+    key counts, latencies and sizes of the logs along with the neurons.
+    """
+    controllers = game.controllers
+    states = [c.neuron.get_state() for c in controllers]
+    buffer_exc, buffer_offsets = _concatenate([s["buffer_exc"] for s in states])
+    buffer_inh, _ = _concatenate([s["buffer_inh"] for s in states])
+    spikes, spike_offsets = _concatenate([c.spikes.times for c in controllers])
+    meta = {
+        "current_time": game.current_time,
+        "dt": game.dt,
+        "is_paused": game.is_paused,
+        "simulation_duration": game.simulation_duration,
+        "delays": list(game.delays),
+        "weights": list(game.weights),
+        "keys": [
+            [list(getattr(stim, "keys", [])) for stim in c.stim_controllers] for c in controllers
+        ],
+        "key_counts": [c.key_count for c in controllers],
+        "log_sizes": [_log_sizes(c) for c in controllers],
+        "latency_counts": game.latency.counts,
+        "background_inputs": [
+            [[until, source.rng.bit_generator.state] for source, until in c.background_inputs]
+            for c in controllers
+        ],
+    }
+    plasticity = {}
+    if game.plasticity is not None:
+        state = game.plasticity.get_state()
+        meta["plasticity_next_snapshot"] = state.pop("next_snapshot")
+        plasticity = {f"plasticity_{k}": v for k, v in state.items()}
+    stream = BytesIO()
+    np.savez(
+        stream,
+        meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        values=np.stack([s["values"] for s in states]),
+        neuron_state=np.stack([s["neuron_state"] for s in states]),
+        buffer_exc=buffer_exc,
+        buffer_inh=buffer_inh,
+        buffer_offsets=buffer_offsets,
+        spikes=spikes,
+        spike_offsets=spike_offsets,
+        current_times=np.array([c.current_time for c in controllers]),
+        connectome=game.connectome,
+        latency_samples=np.stack([game.latency.samples[k] for k in game.latency.counts]),
+        **plasticity,
+    )
+    return stream.getvalue()
+
+
+def load_state(game, blob: bytes):
+    """
+    Restore in place a state produced by dump_state on a GameController with the same
+    neurons and background inputs. Input keys are only restored on controllers with
+    input widgets: headless games, such as forks, have none and skip them.
+    Logs written since the state was dumped are truncated, so that they do not contain the
+    discarded simulation.
+    """
+    data = np.load(BytesIO(blob))
+    meta = json.loads(data["meta"].tobytes().decode())
+    controllers = game.controllers
+    assert data["connectome"].shape == game.connectome.shape
+    assert ("plasticity_next_snapshot" in meta) == (game.plasticity is not None)
+    for i, controller in enumerate(controllers):
+        assert len(meta["background_inputs"][i]) == len(controller.background_inputs)
+        stim_controllers = controller.stim_controllers
+        assert len(stim_controllers) == 0 or len(meta["keys"][i]) == len(stim_controllers)
+        # logs can only be rolled back to an earlier size
+        log_sizes = _log_sizes(controller)
+        assert not controller.save_values or all(
+            size >= saved for size, saved in zip(log_sizes, meta["log_sizes"][i], strict=True)
+        )
+    assert data["latency_samples"].shape[1] == game.latency.capacity
+
+    game.connectome[:] = data["connectome"]
+    if game.plasticity is not None:
+        game.plasticity.set_state(
+            {
+                "weights": data["plasticity_weights"],
+                "pre_trace": data["plasticity_pre_trace"],
+                "post_trace": data["plasticity_post_trace"],
+                "last_spike": data["plasticity_last_spike"],
+                "next_snapshot": meta["plasticity_next_snapshot"],
+            }
+        )
+    game.current_time = meta["current_time"]
+    game.dt = meta["dt"]
+    game.is_paused = meta["is_paused"]
+    game.simulation_duration = meta["simulation_duration"]
+    game.delays = meta["delays"]
+    game.weights = meta["weights"]
+    game.reset_wait_for_key()
+    game.latency.counts = dict(meta["latency_counts"])
+    for stage, samples in zip(meta["latency_counts"], data["latency_samples"], strict=True):
+        game.latency.samples[stage][:] = samples
+    buffers_exc = np.split(data["buffer_exc"], data["buffer_offsets"])
+    buffers_inh = np.split(data["buffer_inh"], data["buffer_offsets"])
+    spikes = np.split(data["spikes"], data["spike_offsets"])
+    for i, controller in enumerate(controllers):
+        controller.neuron.set_state(
+            {
+                "values": data["values"][i],
+                "neuron_state": data["neuron_state"][i],
+                "buffer_exc": buffers_exc[i],
+                "buffer_inh": buffers_inh[i],
+            }
+        )
+        controller.current_time = float(data["current_times"][i])
+        controller.spikes.clear()
+        controller.spikes.extend(spikes[i])
+        controller.key_count = meta["key_counts"][i]
+        controller.keypress_time = None
+        if controller.save_values:
+            for filename, size in zip(
+                [controller.save_file, controller.spike_file], meta["log_sizes"][i], strict=True
+            ):
+                if os.path.exists(filename):
+                    os.truncate(filename, size)
+        for stim, keys in zip(controller.stim_controllers, meta["keys"][i], strict=False):
+            if hasattr(stim, "keys"):
+                stim.set_keys(keys)
+        for background, (until, rng_state) in zip(
+            controller.background_inputs, meta["background_inputs"][i], strict=True
+        ):
+            background[0].rng.bit_generator.state = rng_state
+            background[1] = until
@@ -0,0 +1,79 @@
+import resource
+from argparse import ArgumentParser
+from tkinter import Tk
+
+from neuron_game.display import FIGURE_POOL
+from neuron_game.game import MainMenu, MultiplayerGame, SingleExploration
+
+
+def _max_rss():
+    """
+    Peak resident memory of the process in MB (ru_maxrss is in kB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def round_trip(root, nb_steps: int = 20):
+    """
+    Go through the menu, the single neuron panel and a multiplayer game up to its results,
+    as the game does, tearing each panel down before the next one.
+    """
+    MainMenu(root).cleanup()
+    root.update()
+
+    panel = SingleExploration(root)
+    panel.controller.grid()
+    for _ in range(nb_steps):
+        panel.controller.update()
+        root.update()
+    panel.cleanup()
+
+    panel = MultiplayerGame(root)
+    panel.controller.grid()
+    panel.controller.is_paused = False
+    for _ in range(nb_steps):
+        panel.controller.update()
+        root.update()
+    panel.display_results()
+    root.update()
+    panel.cleanup()
+    root.update()
+
+
+def soak(nb_rounds: int = 300, nb_steps: int = 20, warmup: int = 20, interval: int = 50):
+    """
+    Repeat menu to game round trips and report the peak RSS and the number of pooled
+    figures. Once the pool is warm, both should stay flat.
+    Returns the RSS growth (in MB) after the warmup rounds.
+    """
+    assert nb_rounds > 0
+    warmup = min(warmup, nb_rounds)
+    root = Tk()
+    root.withdraw()
+    root.columnconfigure(0, weight=1)
+    root.rowconfigure(0, weight=1)
+    try:
+        for i in range(nb_rounds):
+            round_trip(root, nb_steps)
+            if i + 1 == warmup:
+                rss_warm = _max_rss()
+            if (i + 1) % interval == 0 or i + 1 == nb_rounds:
+                pooled = {str(k): len(v) for k, v in FIGURE_POOL.free.items()}
+                print(f"round {i + 1}: max RSS {_max_rss():.1f} MB, pooled figures {pooled}")
+    finally:
+        root.destroy()
+    return _max_rss() - rss_warm
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Check that repeated game sessions do not leak memory.")
+    parser.add_argument("-n", "--nb-rounds", type=int, default=300)
+    parser.add_argument("-s", "--nb-steps", type=int, default=20)
+    parser.add_argument(
+        "-g", "--max-growth", type=float, default=20.0, help="Allowed growth after warmup, in MB"
+    )
+    args = parser.parse_args()
+    growth = soak(args.nb_rounds, args.nb_steps)
+    print(f"RSS growth after warmup: {growth:.1f} MB")
+    if growth > args.max_growth:
+        raise SystemExit(f"Memory grew by more than {args.max_growth:.1f} MB after warmup.")
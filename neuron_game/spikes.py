@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class SpikeTrain:
+    """
+    Growable, sorted array of spike times of a single neuron.
+    """
+
+    def __init__(self, capacity: int = 64):
+        assert capacity > 0
+        self._times = np.zeros(capacity)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def times(self):
+        return self._times[: self.size]
+
+    def add(self, t: float):
+        assert self.size == 0 or t >= self._times[self.size - 1]
+        if self.size == len(self._times):
+            self._times = np.concatenate([self._times, np.zeros(len(self._times))])
+        self._times[self.size] = t
+        self.size += 1
+
+    def extend(self, times):
+        times = np.asarray(times, dtype=float)
+        if len(times) == 0:
+            return
+        assert np.all(np.diff(times) >= 0)
+        assert self.size == 0 or times[0] >= self._times[self.size - 1]
+        if self.size + len(times) > len(self._times):
+            capacity = max(2 * len(self._times), self.size + len(times))
+            self._times = np.concatenate([self.times, np.zeros(capacity - self.size)])
+        self._times[self.size : self.size + len(times)] = times
+        self.size += len(times)
+
+    def window(self, t_start: float, t_stop: float):
+        """
+        Return the spike times within [t_start, t_stop] in O(log n).
+        """
+        times = self.times
+        start = np.searchsorted(times, t_start, side="left")
+        stop = np.searchsorted(times, t_stop, side="right")
+        return times[start:stop]
+
+    def clear(self):
+        self.size = 0